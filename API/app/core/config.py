@@ -14,13 +14,130 @@ NEO4J_PASSWORD = require_env("NEO4J_PASSWORD")
 OPENSEARCH_HOST = require_env("OPENSEARCH_HOST")
 REDIS_URL = require_env("REDIS_URL")
 
+# Connection pools
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+OPENSEARCH_MAX_CONNECTIONS = int(os.getenv("OPENSEARCH_MAX_CONNECTIONS", "25"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "100"))
+# Connections opened per backend at startup so first requests skip the handshake
+WARM_CONNECTIONS = int(os.getenv("WARM_CONNECTIONS", "4"))
+BACKEND_TIMEOUT = float(os.getenv("BACKEND_TIMEOUT", "5"))
+
 # Index
-PREFABS_INDEX = "prefabs_v1"
+# Alias that reads and writes go through; versioned indexes sit behind it
+PREFABS_INDEX = os.getenv("PREFABS_INDEX", "prefabs")
 
 # External Services
 DISCORD_CLIENT_ID = require_env("DISCORD_CLIENT_ID")
 DISCORD_CLIENT_SECRET = require_env("DISCORD_CLIENT_SECRET")
 DISCORD_REDIRECT_URI = os.getenv("DISCORD_REDIRECT_URI")
+# Overridable so a local stub OAuth server can stand in for discord.com
+DISCORD_API_BASE = os.getenv("DISCORD_API_BASE", "https://discord.com/api")
+DISCORD_MAX_CONNECTIONS = int(os.getenv("DISCORD_MAX_CONNECTIONS", "20"))
+DISCORD_TIMEOUT = float(os.getenv("DISCORD_TIMEOUT", "10"))
+DISCORD_MAX_RETRIES = int(os.getenv("DISCORD_MAX_RETRIES", "3"))
 
 # Secrets
-JWT_SECRET = require_env("JWT_SECRET")
\ No newline at end of file
+JWT_SECRET = require_env("JWT_SECRET")
+
+# Token verification
+# "jose" (python-jose, default) or "pyjwt" (needs the optional PyJWT package)
+JWT_BACKEND = os.getenv("JWT_BACKEND", "jose")
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+JWT_CACHE_TTL = int(os.getenv("JWT_CACHE_TTL", "300"))
+
+# Pagination
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "200"))
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "100"))
+
+# Cache
+CACHE_TTL_PREFAB = int(os.getenv("CACHE_TTL_PREFAB", "300"))
+CACHE_TTL_SEARCH = int(os.getenv("CACHE_TTL_SEARCH", "60"))
+CACHE_TTL_CREATOR = int(os.getenv("CACHE_TTL_CREATOR", "300"))
+
+# HTTP caching. Responses carry ETags, so short max-ages stay cheap to revalidate.
+CACHE_CONTROL_PREFAB = os.getenv("CACHE_CONTROL_PREFAB", "public, max-age=60, stale-while-revalidate=300")
+CACHE_CONTROL_LIST = os.getenv("CACHE_CONTROL_LIST", "public, max-age=10, stale-while-revalidate=60")
+CACHE_CONTROL_SEARCH = os.getenv("CACHE_CONTROL_SEARCH", "public, max-age=30, stale-while-revalidate=120")
+
+# Search indexing
+INDEXER_BATCH_SIZE = int(os.getenv("INDEXER_BATCH_SIZE", "500"))
+INDEXER_FLUSH_INTERVAL = float(os.getenv("INDEXER_FLUSH_INTERVAL", "1.0"))
+INDEXER_MAX_BACKOFF = float(os.getenv("INDEXER_MAX_BACKOFF", "60.0"))
+# Seconds a worker holds claimed outbox entries before another may retry them
+INDEXER_LEASE_SECONDS = float(os.getenv("INDEXER_LEASE_SECONDS", "120.0"))
+
+
+# Reindexing
+REINDEX_BATCH_SIZE = int(os.getenv("REINDEX_BATCH_SIZE", "1000"))
+REINDEX_CONCURRENCY = int(os.getenv("REINDEX_CONCURRENCY", "4"))
+
+# User profile cache
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_REDIS_TTL = int(os.getenv("USER_CACHE_REDIS_TTL", "3600"))
+
+# Bulk import
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "10000"))
+
+# Suggestions
+SUGGEST_CACHE_SIZE = int(os.getenv("SUGGEST_CACHE_SIZE", "2048"))
+SUGGEST_CACHE_TTL = int(os.getenv("SUGGEST_CACHE_TTL", "30"))
+
+# Search paging
+SEARCH_PIT_KEEP_ALIVE = os.getenv("SEARCH_PIT_KEEP_ALIVE", "2m")
+SEARCH_MAX_RESULT_WINDOW = int(os.getenv("SEARCH_MAX_RESULT_WINDOW", "10000"))
+
+# Graph
+SIMILAR_TOP_K = int(os.getenv("SIMILAR_TOP_K", "20"))
+SIMILAR_BATCH_SIZE = int(os.getenv("SIMILAR_BATCH_SIZE", "500"))
+SIMILAR_INTERVAL = int(os.getenv("SIMILAR_INTERVAL", "3600"))
+CACHE_TTL_SIMILAR = int(os.getenv("CACHE_TTL_SIMILAR", "900"))
+
+# Events
+EVENTS_STREAM = os.getenv("EVENTS_STREAM", "events:interactions")
+EVENTS_STREAM_MAXLEN = int(os.getenv("EVENTS_STREAM_MAXLEN", "1000000"))
+EVENTS_BATCH_SIZE = int(os.getenv("EVENTS_BATCH_SIZE", "1000"))
+EVENTS_MAX_PER_REQUEST = int(os.getenv("EVENTS_MAX_PER_REQUEST", "500"))
+
+# Ranking
+RANKING_INTERVAL = int(os.getenv("RANKING_INTERVAL", "3600"))
+RANKING_BATCH_SIZE = int(os.getenv("RANKING_BATCH_SIZE", "1000"))
+RANKING_FRESHNESS_HALF_LIFE_DAYS = float(os.getenv("RANKING_FRESHNESS_HALF_LIFE_DAYS", "30"))
+RANKING_WEIGHT_QUALITY = float(os.getenv("RANKING_WEIGHT_QUALITY", "1.0"))
+RANKING_WEIGHT_POPULARITY = float(os.getenv("RANKING_WEIGHT_POPULARITY", "1.0"))
+RANKING_WEIGHT_FRESHNESS = float(os.getenv("RANKING_WEIGHT_FRESHNESS", "0.5"))
+
+# Rate limiting
+# Limits are "<requests>/<seconds>" token buckets, per identity (JWT sub or client IP)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "300/60")
+RATE_LIMIT_SEARCH = os.getenv("RATE_LIMIT_SEARCH", "60/60")
+RATE_LIMIT_SUGGEST = os.getenv("RATE_LIMIT_SUGGEST", "300/60")
+RATE_LIMIT_WRITE = os.getenv("RATE_LIMIT_WRITE", "30/60")
+RATE_LIMIT_BULK = os.getenv("RATE_LIMIT_BULK", "5/60")
+RATE_LIMIT_BATCH = os.getenv("RATE_LIMIT_BATCH", "300/60")
+RATE_LIMIT_EVENTS = os.getenv("RATE_LIMIT_EVENTS", "120/60")
+RATE_LIMIT_AUTH = os.getenv("RATE_LIMIT_AUTH", "10/60")
+RATE_LIMIT_LOCAL_SIZE = int(os.getenv("RATE_LIMIT_LOCAL_SIZE", "10000"))
+
+# Tracing
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+# Sampling profiler for slow requests; 0 keeps it off
+PROFILE_SLOW_MS = int(os.getenv("PROFILE_SLOW_MS", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+# Semantic search
+# Needs the optional fastembed package and a reindex to add vectors to existing prefabs
+SEMANTIC_SEARCH_ENABLED = os.getenv("SEMANTIC_SEARCH_ENABLED", "false").lower() == "true"
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "BAAI/bge-small-en-v1.5")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "384"))
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "1"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CACHE_TTL = int(os.getenv("EMBEDDING_CACHE_TTL", str(60 * 60 * 24 * 30)))
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+HYBRID_KNN_K = int(os.getenv("HYBRID_KNN_K", "100"))
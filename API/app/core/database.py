@@ -1,4 +1,8 @@
-from typing import Any
+import asyncio
+import logging
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
 
 from motor.motor_asyncio import (
     AsyncIOMotorClient,
@@ -6,21 +10,122 @@ from motor.motor_asyncio import (
 )
 from neo4j import AsyncDriver, AsyncGraphDatabase
 from opensearchpy import AsyncOpenSearch
+from pymongo import monitoring
 import redis.asyncio as redis
 from redis.asyncio import Redis
 
 from app.core.config import (
+    BACKEND_TIMEOUT,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
     MONGO_URI,
+    NEO4J_MAX_POOL_SIZE,
     NEO4J_URI,
     NEO4J_USER,
     NEO4J_PASSWORD,
     OPENSEARCH_HOST,
+    OPENSEARCH_MAX_CONNECTIONS,
+    REDIS_MAX_CONNECTIONS,
     REDIS_URL,
+    WARM_CONNECTIONS,
 )
+from app.core.metrics import record, timed
+
+logger = logging.getLogger(__name__)
+
+# Clients are created here but connect lazily; the app lifespan warms them up
+# with warm_up() and releases them with close_all().
+
+# Every backend call is timed into app.core.metrics: Mongo through the
+# driver's command monitoring, the others by wrapping their request method.
+
+class MongoCommandTimings(monitoring.CommandListener):
+    """Times each Mongo command, labelled by command and collection."""
+
+    def __init__(self) -> None:
+        self._started: Dict[Tuple[Any, int], str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        target = event.command.get("collection" if event.command_name == "getMore" else event.command_name)
+        label = f"{event.command_name} {target}" if isinstance(target, str) else event.command_name
+        self._started[(event.connection_id, event.request_id)] = label
+
+    def _finished(self, event: Any) -> None:
+        label = self._started.pop((event.connection_id, event.request_id), event.command_name)
+        record("mongodb", label, event.duration_micros / 1_000_000)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finished(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finished(event)
+
+
+class MongoPoolStats(monitoring.ConnectionPoolListener):
+    """Live pool counts, kept from the driver's connection pool (CMAP) events."""
+
+    def __init__(self) -> None:
+        self.open = 0
+        self.in_use = 0
+        self.checkout_failures = 0
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        self.open += 1
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        self.open -= 1
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        self.in_use += 1
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        self.in_use -= 1
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        self.checkout_failures += 1
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        pass
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+
+def _calling_function(*args: Any, **kwargs: Any) -> str:
+    # Cypher text makes a poor label; the function issuing it names it well
+    return sys._getframe(2).f_code.co_name
+
+
+def _opensearch_operation(method: str, url: str, *args: Any, **kwargs: Any) -> str:
+    endpoint = next((part for part in url.split("/") if part.startswith("_")), "/")
+    return f"{method} {endpoint}"
+
+
+def _redis_command(*args: Any, **kwargs: Any) -> str:
+    return str(args[0]).upper()
+
 
 # ---- MongoDB ----
+mongo_pool_stats = MongoPoolStats()
+
 mongo_client: AsyncIOMotorClient[dict[str, Any]] = AsyncIOMotorClient(
-    MONGO_URI
+    MONGO_URI,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    serverSelectionTimeoutMS=int(BACKEND_TIMEOUT * 1000),
+    event_listeners=[MongoCommandTimings(), mongo_pool_stats],
 )
 
 mongo_db: AsyncIOMotorDatabase[dict[str, Any]] = (
@@ -31,13 +136,163 @@ mongo_db: AsyncIOMotorDatabase[dict[str, Any]] = (
 neo4j_driver: AsyncDriver = AsyncGraphDatabase.driver( # type: ignore
     NEO4J_URI,
     auth=(NEO4J_USER, NEO4J_PASSWORD),
+    max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+    connection_acquisition_timeout=BACKEND_TIMEOUT,
 )
+neo4j_driver.execute_query = timed("neo4j", _calling_function, neo4j_driver.execute_query) # type: ignore
 
 # ---- OpenSearch ----
 opensearch = AsyncOpenSearch(
     OPENSEARCH_HOST,
     http_compress=True,
+    maxsize=OPENSEARCH_MAX_CONNECTIONS,
+)
+opensearch.transport.perform_request = timed( # type: ignore
+    "opensearch", _opensearch_operation, opensearch.transport.perform_request
 )
 
 # ---- Redis ----
-redis_client: Redis = redis.from_url(REDIS_URL) # type: ignore
+redis_client: Redis = redis.from_url( # type: ignore
+    REDIS_URL,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    health_check_interval=30,
+)
+redis_client.execute_command = timed("redis", _redis_command, redis_client.execute_command) # type: ignore
+_redis_pipeline = redis_client.pipeline
+
+
+def _timed_pipeline(*args: Any, **kwargs: Any) -> Any:
+    pipe = _redis_pipeline(*args, **kwargs)
+    pipe.execute = timed("redis", lambda *a, **k: "pipeline", pipe.execute) # type: ignore
+    return pipe
+
+
+redis_client.pipeline = _timed_pipeline # type: ignore
+
+
+async def _ping_mongo() -> None:
+    await mongo_db.command("ping")
+
+
+async def _ping_neo4j() -> None:
+    await neo4j_driver.verify_connectivity()
+
+
+async def _ping_opensearch() -> None:
+    if not await opensearch.ping():
+        raise ConnectionError("OpenSearch did not answer ping")
+
+
+async def _ping_redis() -> None:
+    await redis_client.ping()
+
+
+PINGS: Dict[str, Callable[[], Awaitable[None]]] = {
+    "mongodb": _ping_mongo,
+    "neo4j": _ping_neo4j,
+    "opensearch": _ping_opensearch,
+    "redis": _ping_redis,
+}
+
+
+async def _timed_ping(name: str) -> float:
+    started = time.perf_counter()
+    await asyncio.wait_for(PINGS[name](), timeout=BACKEND_TIMEOUT)
+    return (time.perf_counter() - started) * 1000
+
+
+async def warm_up(connections: int = WARM_CONNECTIONS) -> None:
+    """Open `connections` connections to every backend in parallel.
+
+    Concurrent pings force each pool to create that many connections, so the
+    TCP/TLS setup happens at startup instead of on the first requests.
+    """
+    names = [name for name in PINGS for _ in range(max(connections, 1))]
+    results = await asyncio.gather(*(_timed_ping(name) for name in names), return_exceptions=True)
+
+    for name in PINGS:
+        errors = [r for n, r in zip(names, results) if n == name and isinstance(r, BaseException)]
+        if errors:
+            logger.warning("Could not warm up %s: %s", name, errors[0])
+
+
+def _neo4j_pool() -> Dict[str, Any]:
+    # The driver has no public pool metrics, so count its connection table
+    pool = getattr(neo4j_driver, "_pool", None)
+    connections = [
+        connection
+        for queue in list(getattr(pool, "connections", {}).values())
+        for connection in list(queue)
+    ]
+    return {
+        "max_size": NEO4J_MAX_POOL_SIZE,
+        "open": len(connections),
+        "in_use": sum(1 for connection in connections if getattr(connection, "in_use", False)),
+    }
+
+
+def _opensearch_pool() -> Dict[str, Any]:
+    # One aiohttp session per node; its connector holds that node's sockets
+    pool = getattr(opensearch.transport, "connection_pool", None)
+    idle = in_use = 0
+    for connection in getattr(pool, "connections", []):
+        connector = getattr(getattr(connection, "session", None), "connector", None)
+        if connector is None:
+            continue
+        idle += sum(len(sockets) for sockets in getattr(connector, "_conns", {}).values())
+        in_use += len(getattr(connector, "_acquired", ()))
+
+    return {
+        "max_size": OPENSEARCH_MAX_CONNECTIONS,
+        "nodes": len(opensearch.transport.hosts), # type: ignore
+        "idle": idle,
+        "in_use": in_use,
+    }
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    redis_pool = redis_client.connection_pool
+
+    return {
+        "mongodb": {
+            "max_size": MONGO_MAX_POOL_SIZE,
+            "min_size": MONGO_MIN_POOL_SIZE,
+            "open": mongo_pool_stats.open,
+            "in_use": mongo_pool_stats.in_use,
+            "checkout_failures": mongo_pool_stats.checkout_failures,
+        },
+        "neo4j": _neo4j_pool(),
+        "opensearch": _opensearch_pool(),
+        "redis": {
+            "max_size": redis_pool.max_connections,
+            "idle": len(getattr(redis_pool, "_available_connections", [])),
+            "in_use": len(getattr(redis_pool, "_in_use_connections", [])),
+        },
+    }
+
+
+async def backend_health() -> Dict[str, Dict[str, Any]]:
+    """Ping every backend in parallel and report latency next to its pool stats."""
+    names = list(PINGS)
+    results = await asyncio.gather(*(_timed_ping(name) for name in names), return_exceptions=True)
+    stats = pool_stats()
+
+    health: Dict[str, Dict[str, Any]] = {}
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            health[name] = {"status": "down", "error": repr(result), "pool": stats[name]}
+        else:
+            health[name] = {"status": "up", "ping_ms": round(result, 2), "pool": stats[name]}
+
+    return health
+
+
+async def close_all() -> None:
+    """Drain every client's connections. Safe to call on shutdown of any process."""
+    mongo_client.close()
+    await asyncio.gather(
+        neo4j_driver.close(),
+        opensearch.close(),
+        redis_client.aclose(),
+        return_exceptions=True,
+    )
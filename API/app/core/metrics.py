@@ -0,0 +1,86 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from prometheus_client import Histogram
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+# Backend calls are mostly sub-millisecond to a few hundred ms
+BACKEND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+backend_latency = Histogram(
+    "backend_request_duration_seconds",
+    "Time spent in calls to a backend, by operation",
+    ["backend", "operation"],
+    buckets=BACKEND_BUCKETS,
+)
+
+http_latency = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the end of the response body",
+    ["method", "route", "status"],
+)
+
+# Per-request totals, {backend: [seconds, calls]}; None outside a request.
+# Holds a mutable dict so calls made in copied contexts (Motor's executor
+# threads, shared single-flight tasks) still add to the request's totals.
+request_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("request_timings", default=None)
+
+
+def record(backend: str, operation: str, seconds: float) -> None:
+    backend_latency.labels(backend, operation).observe(seconds)
+
+    timings = request_timings.get()
+    if timings is not None:
+        totals = timings.setdefault(backend, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += 1
+
+
+def timed(backend: str, operation: Callable[..., str], func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an async callable so each await is recorded under `backend`.
+
+    `operation` derives the label from the call's arguments. It runs at call
+    time, so it can also look at the caller's frame.
+    """
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        label = operation(*args, **kwargs)
+
+        async def call() -> Any:
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                record(backend, label, time.perf_counter() - started)
+
+        return call()
+
+    return wrapper
+
+
+def server_timing(timings: Dict[str, List[float]], total: float) -> str:
+    entries = [
+        f'{backend};dur={seconds * 1000:.1f};desc="{int(calls)} calls"'
+        for backend, (seconds, calls) in timings.items()
+    ]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class StatsCollector(Collector):
+    """Expose an existing stats dict (cache, rate limiter) as gauges at scrape time."""
+
+    def __init__(self, prefix: str, stats: Callable[[], Dict[str, Any]]):
+        self.prefix = prefix
+        self.stats = stats
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        for name, value in self.stats().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield GaugeMetricFamily(f"{self.prefix}_{name}", f"{self.prefix} {name}", value=value)
+            elif isinstance(value, dict):
+                family = GaugeMetricFamily(f"{self.prefix}_{name}", f"{self.prefix} {name}", labels=["key"])
+                for key, item in value.items(): # type: ignore
+                    family.add_metric([str(key)], item)
+                yield family
@@ -0,0 +1,51 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+from fastapi import Request, Response
+
+
+def model_response(model: BaseModel, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serialize an already validated model straight to JSON bytes.
+
+    Returning a Response skips FastAPI's response_model pass, which would
+    validate the model a second time and then encode it through json.dumps.
+    Keep response_model on the route so the OpenAPI schema stays the same.
+    """
+    return Response(
+        content=model.model_dump_json(by_alias=True),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from values that change whenever the representation does."""
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def cache_headers(etag: Optional[str], cache_control: str) -> Dict[str, str]:
+    headers = {"Cache-Control": cache_control}
+    if etag is not None:
+        headers["ETag"] = etag
+    return headers
+
+
+def not_modified(request: Request, etag: Optional[str], cache_control: str) -> Optional[Response]:
+    """A 304 when If-None-Match already holds `etag`, otherwise None.
+
+    Checked before the body is loaded or serialized, so a revalidation costs
+    only what it took to compute the ETag.
+    """
+    header = request.headers.get("if-none-match")
+    if etag is None or header is None:
+        return None
+
+    # If-None-Match uses weak comparison, so a W/ prefix still matches
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if "*" not in candidates and etag not in candidates:
+        return None
+
+    return Response(status_code=304, headers=cache_headers(etag, cache_control))
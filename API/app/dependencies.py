@@ -1,14 +1,74 @@
+import hashlib
+import time
+from typing import Any, Callable
+
 from fastapi import Depends, HTTPException, status
 from jose import jwt, JWTError, ExpiredSignatureError
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from app.core.config import JWT_SECRET
+from app.core.config import JWT_BACKEND, JWT_CACHE_SIZE, JWT_CACHE_TTL, JWT_SECRET
+from app.services.cache import LRUCache
 
 security = HTTPBearer()
 
-def get_current_user_id(
+# Verified claims keyed by a hash of the token, so raw tokens are never held
+# in memory longer than the request. Entries never outlive the token's `exp`.
+verified_tokens: LRUCache[bytes, dict[str, Any]] = LRUCache(JWT_CACHE_SIZE, JWT_CACHE_TTL)
+
+
+def _jose_decode(token: str) -> dict[str, Any]:
+    return jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+
+
+def _load_decoder() -> Callable[[str], dict[str, Any]]:
+    """Pick the JWT backend. Errors are normalised to python-jose's exceptions."""
+    if JWT_BACKEND == "jose":
+        return _jose_decode
+
+    if JWT_BACKEND != "pyjwt":
+        raise RuntimeError(f"Unknown JWT_BACKEND: {JWT_BACKEND}")
+
+    try:
+        import jwt as pyjwt
+    except ImportError:
+        raise RuntimeError("JWT_BACKEND=pyjwt needs the PyJWT package installed")
+
+    def _pyjwt_decode(token: str) -> dict[str, Any]:
+        try:
+            return pyjwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+        except pyjwt.ExpiredSignatureError as e:
+            raise ExpiredSignatureError(str(e)) from e
+        except pyjwt.InvalidTokenError as e:
+            raise JWTError(str(e)) from e
+
+    return _pyjwt_decode
+
+
+decode_token = _load_decoder()
+
+
+def verify_token(token: str) -> dict[str, Any]:
+    """Decode and verify a token, reusing earlier verifications of the same token."""
+    key = hashlib.sha256(token.encode()).digest()
+
+    claims = verified_tokens.get(key)
+    if claims is not None:
+        return claims
+
+    claims = decode_token(token)
+
+    ttl: float = JWT_CACHE_TTL
+    if "exp" in claims:
+        ttl = min(ttl, claims["exp"] - time.time())
+    if ttl > 0:
+        verified_tokens.set(key, claims, ttl)
+
+    return claims
+
+
+def get_current_user(
     creds: HTTPAuthorizationCredentials = Depends(security),
-):
+) -> dict[str, Any]:
     if not creds:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -18,15 +78,14 @@ def get_current_user_id(
 
     token = creds.credentials
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        user_id = payload.get("sub")
-        if user_id is None:
+        payload = verify_token(token)
+        if payload.get("sub") is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token missing user ID",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return user_id
+        return payload
     except ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,3 +98,7 @@ def get_current_user_id(
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+def get_current_user_id(claims: dict[str, Any] = Depends(get_current_user)) -> str:
+    return claims["sub"]
@@ -1,15 +1,99 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from app.core.config import BACKEND_TIMEOUT, RATE_LIMIT_ENABLED
+from app.core.database import backend_health, close_all, warm_up
+from app.core.metrics import StatsCollector
+from app.middleware import RateLimitMiddleware, TimingMiddleware
 from app.routers.prefab import router as prefabs
 from app.routers.auth import router as auth
 from app.routers.user import router as users
+from app.routers.event import router as events
+from app.services import cache, ratelimit
+from app.services.discord import discord_client
+from app.services.embeddings import embedder
+from app.services.events import event_consumer
+from app.services.graph import ensure_constraints, similarity_job
+from app.services.ranking import ranking_job
+from app.services.indexer import graph_projector, search_indexer
+from app.services.indexes import ensure_indexes
+from app.services.openSearch import ensure_index
+from app.services.profiler import profiler
+
+
+logger = logging.getLogger(__name__)
+
+
+async def set_up(name: str, step: Callable[[], Awaitable[None]]) -> None:
+    """Run a startup step, retrying in the background while its backend is down."""
+    delay = 1.0
+    while True:
+        try:
+            await step()
+            return
+        except Exception as e:
+            logger.warning("%s failed, retrying in %.0fs: %r", name, delay, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+
+
+async def start_search_indexer() -> None:
+    # Writes before the alias exists would auto-create a concrete index in its place
+    await set_up("Creating the search index", ensure_index)
+    search_indexer.start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await warm_up()
+
+    # A backend that is down must not stop the app from starting: /health
+    # reports it as degraded while its setup keeps retrying
+    setup = [
+        asyncio.create_task(start_search_indexer()),
+        asyncio.create_task(set_up("Creating Mongo indexes", ensure_indexes)),
+        asyncio.create_task(set_up("Creating Neo4j constraints", ensure_constraints)),
+    ]
+    await asyncio.wait(setup, timeout=BACKEND_TIMEOUT * 2)
+
+    discord_client.start()
+    embedder.start()
+    graph_projector.start()
+    similarity_job.start()
+    ranking_job.start()
+    event_consumer.start()
+    profiler.start()
+    yield
+    for task in setup:
+        task.cancel()
+    await asyncio.gather(*setup, return_exceptions=True)
+    profiler.stop()
+    await event_consumer.stop()
+    await ranking_job.stop()
+    await similarity_job.stop()
+    await graph_projector.stop()
+    await search_indexer.stop()
+    embedder.close()
+    await discord_client.close()
+    await close_all()
 
-app = FastAPI(title="Prefab Resource Hub API")
+
+app = FastAPI(title="Prefab Resource Hub API", lifespan=lifespan)
 
 app.include_router(prefabs)
 app.include_router(auth)
 app.include_router(users)
+app.include_router(events)
 
+# Added before CORS so rejections still carry CORS headers
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+app.add_middleware(TimingMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,7 +111,33 @@ async def index():
     }
 
 @app.get("/health")
-async def get_service_health():
+async def get_service_health(response: Response):
+    backends = await backend_health()
+    healthy = all(backend["status"] == "up" for backend in backends.values())
+
+    if not healthy:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
     return {
-        "Health": "Healthy"
+        "Health": "Healthy" if healthy else "Degraded",
+        "Backends": backends
     }
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return cache.get_stats()
+
+
+@app.get("/ratelimit/stats")
+async def get_ratelimit_stats():
+    return ratelimit.get_stats()
+
+
+REGISTRY.register(StatsCollector("cache", cache.get_stats))
+REGISTRY.register(StatsCollector("ratelimit", ratelimit.get_stats))
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+from jose import JWTError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import SERVER_TIMING_ENABLED
+from app.core.metrics import http_latency, request_timings, server_timing
+from app.dependencies import verify_token
+from app.services import ratelimit
+from app.services.profiler import profiler
+
+
+def client_identity(scope: Scope, headers: Dict[bytes, bytes]) -> str:
+    """JWT subject for signed-in callers, client IP for everyone else."""
+    auth = headers.get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = auth.partition(" ")
+
+    if scheme.lower() == "bearer" and token:
+        try:
+            # Verification is cached, so the route's own auth check is free afterwards
+            claims: Dict[str, Any] = verify_token(token)
+            if claims.get("sub"):
+                return f"user:{claims['sub']}"
+        except JWTError:
+            pass
+
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """Token-bucket limits per route rule and caller, with RateLimit-* headers."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        r = ratelimit.match_rule(scope["method"], scope["path"])
+        if r is None:
+            await self.app(scope, receive, send)
+            return
+
+        decision = await ratelimit.check(r, client_identity(scope, dict(scope["headers"])))
+        headers = [
+            (b"ratelimit-limit", str(decision.limit).encode()),
+            (b"ratelimit-remaining", str(decision.remaining).encode()),
+            (b"ratelimit-reset", str(decision.reset).encode()),
+            (b"ratelimit-policy", f"{r.capacity};w={int(r.period)}".encode()),
+        ]
+
+        if not decision.allowed:
+            body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(decision.retry_after).encode()),
+                    *headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class TimingMiddleware:
+    """Per-request latency metrics, a Server-Timing header and slow-request profiles."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, List[float]] = {}
+        token = request_timings.set(timings)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    header = server_timing(timings, time.perf_counter() - started)
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            finished = time.perf_counter()
+            request_timings.reset(token)
+
+            # Route templates keep label cardinality bounded; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_latency.labels(scope["method"], route, str(status_code)).observe(finished - started)
+
+            if profiler.enabled and finished - started >= profiler.threshold:
+                await profiler.dump(id(asyncio.current_task()), started, finished, f"{scope['method']} {route}")
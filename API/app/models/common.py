@@ -1,4 +1,23 @@
+from datetime import datetime, timezone
 from typing import Annotated
-from pydantic import BeforeValidator
+from pydantic import BeforeValidator, PlainSerializer
 
 PyObjectId = Annotated[str, BeforeValidator(str)]
+
+
+def sortable_timestamp(value: datetime | str) -> str:
+    """UTC ISO 8601 with fixed-width microseconds, so string order is time order.
+
+    Plain isoformat() drops `.ffffff` when it is zero and renders offsets and
+    naive values differently, which breaks comparisons on the stored strings.
+    Naive values are taken as UTC.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+# Persisted with model_dump(mode="json") and range-compared as a string by keyset paging
+SortableDatetime = Annotated[datetime, PlainSerializer(sortable_timestamp, when_used="json")]
@@ -0,0 +1,33 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.core.config import EVENTS_MAX_PER_REQUEST
+
+
+class EventType(str, Enum):
+    CLICKED = "clicked"
+    FAVORITED = "favorited"
+
+class Event(BaseModel):
+    prefab_id: str = Field(..., min_length=24, max_length=24)
+    type: EventType = Field(...)
+    timestamp: Optional[datetime] = None
+
+class EventBatch(BaseModel):
+    events: List[Event] = Field(..., min_length=1, max_length=EVENTS_MAX_PER_REQUEST)
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "events": [
+                    {
+                        "prefab_id": "6968fc1d15ac634a16ff0e0b",
+                        "type": "clicked",
+                        "timestamp": "2026-01-14T13:01:02Z"
+                    }
+                ]
+            }
+        },
+    )
@@ -5,7 +5,8 @@ from bson import ObjectId
 from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 from enum import Enum
 
-from app.models.common import PyObjectId
+from app.core.config import BATCH_MAX_IDS
+from app.models.common import PyObjectId, SortableDatetime
 
 
 class UseCase(str, Enum):
@@ -126,8 +127,8 @@ class Prefab(UserCreatedPrefab):
 
     creator_id: PyObjectId = Field(...)
 
-    created_at: datetime = Field(default=datetime.now(timezone.utc))
-    updated_at: Optional[datetime] = Field(default=None)
+    created_at: SortableDatetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: Optional[SortableDatetime] = Field(default=None)
     
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
@@ -160,4 +161,25 @@ class Prefab(UserCreatedPrefab):
                 "updated_at": None
             }
         },
-    )
\ No newline at end of file
+    )
+
+class PrefabPage(BaseModel):
+    items: List[Prefab] = Field(...)
+    next_cursor: Optional[str] = Field(default=None)
+
+class PrefabBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=BATCH_MAX_IDS)
+
+class PrefabBatch(BaseModel):
+    items: List[Prefab] = Field(...)
+    missing: List[str] = Field(default_factory=list)
+
+class CategoryStats(BaseModel):
+    category: Categories = Field(...)
+    count: int = Field(...)
+    last_updated: Optional[datetime] = Field(default=None)
+
+class CreatorPrefabPage(PrefabPage):
+    total: int = Field(default=0)
+    last_updated: Optional[datetime] = Field(default=None)
+    categories: List[CategoryStats] = Field(default_factory=list)
@@ -35,4 +35,10 @@ class User(BaseModel):
                 "avatar": "a_1b2c3d4e",
             }
         },
-    )
\ No newline at end of file
+    )
+
+class UserProfile(BaseModel):
+    id: PyObjectId = Field(...)
+    username: str = Field(...)
+    discord_id: Optional[str] = None
+    avatar: Optional[str] = None
@@ -1,14 +1,15 @@
 from typing import Any
-from fastapi import APIRouter, HTTPException
+from bson import ObjectId
+from fastapi import APIRouter, BackgroundTasks, HTTPException
 import httpx
 import time
 from datetime import datetime, timezone
 from jose import jwt
+from pymongo import ReturnDocument
 
 # Secrets
 from app.core.config import (
     DISCORD_CLIENT_ID,
-    DISCORD_CLIENT_SECRET,
     DISCORD_REDIRECT_URI,
     JWT_SECRET,
 )
@@ -19,6 +20,10 @@ from app.core.database import mongo_db
 # Models
 from app.models.user import User, UserCreate
 
+# Services
+from app.services import users
+from app.services.discord import discord_client
+
 
 router = APIRouter(prefix="/auth/discord", tags=["auth"])
 
@@ -38,20 +43,10 @@ def discord_login():
 
 
 @router.get("/callback")
-async def discord_callback(code: str) -> dict[str, Any]:
-    async with httpx.AsyncClient() as client:
+async def discord_callback(code: str, background_tasks: BackgroundTasks) -> dict[str, Any]:
+    try:
         # Exchange code for token
-        token_res = await client.post(
-            "https://discord.com/api/oauth2/token",
-            data={
-                "client_id": DISCORD_CLIENT_ID,
-                "client_secret": DISCORD_CLIENT_SECRET,
-                "grant_type": "authorization_code",
-                "code": code,
-                "redirect_uri": DISCORD_REDIRECT_URI,
-            },
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-        )
+        token_res = await discord_client.exchange_code(code)
 
         if token_res.status_code != 200:
             raise HTTPException(status_code=400, detail="Discord token exchange failed")
@@ -59,45 +54,47 @@ async def discord_callback(code: str) -> dict[str, Any]:
         access_token = token_res.json()["access_token"]
 
         # Fetch Discord user
-        user_res = await client.get(
-            "https://discord.com/api/users/@me",
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
+        user_res = await discord_client.fetch_user(access_token)
+    except httpx.TransportError:
+        raise HTTPException(status_code=502, detail="Discord unreachable")
 
-        if user_res.status_code != 200:
-            raise HTTPException(status_code=400, detail="Failed to fetch Discord user")
+    if user_res.status_code != 200:
+        raise HTTPException(status_code=400, detail="Failed to fetch Discord user")
 
-        discord_user = user_res.json()
+    discord_user = user_res.json()
 
-    # Check existing user
-    existing = await users_collection.find_one(
-        {"discord_id": discord_user["id"]}
+    user_in = UserCreate(
+        discord_id=discord_user["id"],
+        username=discord_user["username"],
+        discriminator=discord_user.get("discriminator"),
+        avatar=discord_user.get("avatar"),
     )
 
     now = datetime.now(timezone.utc)
 
-    if existing:
-        await users_collection.update_one(
-            {"_id": existing["_id"]},
-            {"$set": {"last_login": now}},
-        )
-        user = User(**existing)
-    else:
-        user_in = UserCreate(
-            discord_id=discord_user["id"],
-            username=discord_user["username"],
-            discriminator=discord_user.get("discriminator"),
-            avatar=discord_user.get("avatar"),
-        )
-
-        insert_data = user_in.model_dump()
-        insert_data["created_at"] = now
-        insert_data["last_login"] = now
+    # Single round trip upsert. The previous version tells us whether the user is
+    # new and whether their username changed; a new user gets the _id we pick here.
+    new_id = ObjectId()
+    previous = await users_collection.find_one_and_update(
+        {"discord_id": user_in.discord_id},
+        {
+            "$set": {**user_in.model_dump(exclude={"discord_id"}), "last_login": now},
+            "$setOnInsert": {"_id": new_id, "created_at": now},
+        },
+        upsert=True,
+        return_document=ReturnDocument.BEFORE,
+    )
 
-        result = await users_collection.insert_one(insert_data)
-        insert_data["_id"] = result.inserted_id
+    if previous is None:
+        user = User(**user_in.model_dump(), _id=new_id, created_at=now, last_login=now)
+    else:
+        user = User(**{**previous, **user_in.model_dump(), "last_login": now})
 
-        user = User(**insert_data)
+    # Refresh the profile cache before re-indexing so the indexer sees the new name
+    await users.remember_profile(user.model_dump(by_alias=True))
+    # The rewrite waits on OpenSearch, so it runs after the response is sent
+    if previous is not None and previous["username"] != user.username:
+        background_tasks.add_task(users.propagate_username, str(user.id), user.username)
 
     # Create JWT
     payload: dict[str, Any] = {
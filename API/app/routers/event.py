@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from redis.exceptions import RedisError
+
+from app.dependencies import get_current_user_id
+from app.models.event import EventBatch
+from app.services import events
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.post("/", status_code=status.HTTP_202_ACCEPTED)
+async def ingest_events(batch: EventBatch, user_id: str = Depends(get_current_user_id)):
+    # Only buffered here; the event consumer writes them to Neo4j and Mongo later
+    try:
+        await events.publish(user_id, batch.events)
+    except RedisError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event buffer unavailable"
+        )
+
+    return {"accepted": len(batch.events)}
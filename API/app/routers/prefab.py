@@ -1,15 +1,33 @@
 from datetime import datetime, timezone
-from typing import Any, List
+import json
+from typing import Any, AsyncIterator, List, Literal
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from opensearchpy.exceptions import NotFoundError
+from pydantic import ValidationError
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+
+# Config
+from app.core.config import (
+    BULK_BATCH_SIZE, BULK_MAX_ITEMS, CACHE_CONTROL_LIST, CACHE_CONTROL_PREFAB,
+    CACHE_CONTROL_SEARCH, CACHE_TTL_PREFAB, CACHE_TTL_SEARCH,
+    CACHE_TTL_SIMILAR, HYBRID_KNN_K, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, PREFABS_INDEX,
+    RANKING_WEIGHT_FRESHNESS, RANKING_WEIGHT_POPULARITY, RANKING_WEIGHT_QUALITY,
+    SEARCH_MAX_RESULT_WINDOW, SEARCH_PIT_KEEP_ALIVE, SIMILAR_TOP_K,
+    SUGGEST_CACHE_SIZE, SUGGEST_CACHE_TTL
+)
 
 # Databases
 from app.core.database import mongo_db, opensearch
+from app.core.responses import cache_headers, make_etag, model_response, not_modified
 
 # Custom Data
+from app.models.common import sortable_timestamp
 from app.models.prefab import(
-    Prefab, PrefabUpdate, UserCreatedPrefab,
+    Prefab, PrefabBatch, PrefabBatchRequest, PrefabPage, PrefabUpdate, UserCreatedPrefab,
     UseCase, Licencing, Categories
 )
 
@@ -17,11 +35,25 @@ from app.models.prefab import(
 from app.dependencies import get_current_user_id
 
 # Fucntions
-from app.services.openSearch import prefab_to_search_doc
+from app.services import cache, graph
+from app.services import indexer
+from app.services.embeddings import embedder
+from app.services.openSearch import (
+    DEFAULT_SEARCH_FIELDS, INDEXED_PREFAB_FIELDS, SEARCH_FIELDS, unsupported_features
+)
+from app.services.pagination import (
+    KEYSET_SORT, decode_token, encode_cursor, encode_token, json_default,
+    keyset_filter
+)
 
 
 router = APIRouter(prefix="/prefabs", tags=["Prefabs"])
 
+# Hot prefixes repeat across users, so a short in-process cache skips OpenSearch
+suggest_cache: cache.LRUCache[tuple[str, int], dict[str, Any]] = cache.LRUCache(
+    SUGGEST_CACHE_SIZE, SUGGEST_CACHE_TTL
+)
+
 @router.post("/")
 async def create_prefab(
     payload: UserCreatedPrefab,
@@ -41,50 +73,174 @@ async def create_prefab(
     )
 
     prefab_id = result.inserted_id
-    cleaned_payload.id = prefab_id
 
-    # fetch creator username
-    user_doc = await mongo_db.users.find_one({"_id": ObjectId(user_id)})
-    creator_username = user_doc["username"] # type: ignore
+    # Search indexing happens in the background worker, which resolves the
+    # creator's username through the profile cache
+    await indexer.enqueue(str(prefab_id))
+    await cache.invalidate_creator(user_id)
+    await cache.bump_prefabs_version()
 
-    search_doc = await prefab_to_search_doc(cleaned_payload, creator_username) # type: ignore
+    return {"id": str(prefab_id)}
 
-    # index into OpenSearch
-    await opensearch.index(
-        index="prefabs_v1",
-        id=str(prefab_id),
-        body=search_doc
-    )
+async def _read_bulk_items(request: Request) -> AsyncIterator[Any]:
+    """Yield raw items from an NDJSON stream (as bytes lines) or a JSON array."""
+    if "ndjson" in request.headers.get("content-type", ""):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+
+        if buffer.strip():
+            yield buffer
+        return
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body must be a JSON array or NDJSON"
+        )
+
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body must be a JSON array or NDJSON"
+        )
+
+    for item in items: # type: ignore
+        yield item
 
-    return {"id": str(prefab_id)}
+
+async def _insert_batch(batch: List[tuple[int, dict[str, Any]]], results: List[dict[str, Any]]) -> None:
+    failed: dict[int, str] = {}
+
+    try:
+        await mongo_db.prefabs.insert_many([doc for _, doc in batch], ordered=False)
+    except BulkWriteError as e:
+        for error in e.details["writeErrors"]:
+            failed[error["index"]] = error["errmsg"]
+
+    created: List[str] = []
+    for position, (item_index, doc) in enumerate(batch):
+        if position in failed:
+            results.append({"index": item_index, "status": "error", "error": failed[position]})
+        else:
+            created.append(str(doc["_id"]))
+            results.append({"index": item_index, "status": "created", "id": str(doc["_id"])})
+
+    await indexer.enqueue_many(created)
+
+
+@router.post("/bulk")
+async def bulk_create_prefabs(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=BULK_MAX_ITEMS),
+    user_id: str = Depends(get_current_user_id)
+) -> dict[str, Any]:
+    results: List[dict[str, Any]] = []
+    batch: List[tuple[int, dict[str, Any]]] = []
+    count = 0
+    truncated = False
+
+    async for item in _read_bulk_items(request):
+        # Anything past the limit is left unread and reported as truncated
+        if count >= BULK_MAX_ITEMS:
+            truncated = True
+            break
+
+        try:
+            if isinstance(item, bytes):
+                payload = UserCreatedPrefab.model_validate_json(item)
+            else:
+                payload = UserCreatedPrefab.model_validate(item)
+        except ValidationError as e:
+            results.append({"index": count, "status": "invalid", "errors": json.loads(e.json(include_url=False))})
+            count += 1
+            continue
+
+        doc = Prefab(
+            **payload.model_dump(),
+            creator_id=user_id
+        ).model_dump(by_alias=True, exclude_none=True, mode="json")
+        doc["_id"] = ObjectId()
+
+        batch.append((count, doc))
+        count += 1
+
+        if len(batch) >= batch_size:
+            await _insert_batch(batch, results)
+            batch = []
+
+    if batch:
+        await _insert_batch(batch, results)
+
+    results.sort(key=lambda r: r["index"])
+    created = sum(1 for r in results if r["status"] == "created")
+    if created:
+        await cache.invalidate_creator(user_id)
+        await cache.bump_prefabs_version()
+
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "truncated": truncated,
+        "results": results
+    }
 
 @router.get("/search")
 async def search_prefabs(
+    request: Request,
+    response: Response,
     q: str = Query(..., min_length=1),
     use_cases: List[UseCase] | None = Query(None),
     categories: List[Categories] | None = Query(None),
     is_free: bool | None = None,
     licence_type: Licencing | None = None,
-    limit: int = 20,
-    offset: int = 0
+    fields: List[str] | None = Query(None),
+    highlight: bool = True,
+    facets: bool = False,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    deep: bool = False,
+    cursor: str | None = None,
+    mode: Literal["lexical", "hybrid"] = "lexical"
 ) -> dict[str, Any]:
-    filters = []
+    source = fields or DEFAULT_SEARCH_FIELDS
+    unknown = set(source) - set(SEARCH_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+
+    if offset + limit > SEARCH_MAX_RESULT_WINDOW:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Result window too large, page with deep=true and cursor instead"
+        )
+
+    # Keyed by facet name so facet aggregations can leave out their own filter
+    filters: dict[str, dict[str, Any]] = {}
 
     if use_cases:
-        filters.append({"terms": {"use_cases.keyword": [uc.value for uc in use_cases]}}) # type: ignore
+        filters["use_cases"] = {"terms": {"use_cases.keyword": [uc.value for uc in use_cases]}}
 
     if categories:
-        filters.append({"terms": {"categories.keyword": [cat.value for cat in categories]}}) # type: ignore
+        filters["categories"] = {"terms": {"categories.keyword": [cat.value for cat in categories]}}
 
     if is_free is not None:
-        filters.append({"term": {"is_free": is_free}}) # type: ignore
+        filters["is_free"] = {"term": {"is_free": is_free}}
 
     if licence_type:
-        filters.append({"term": {"licence_type.keyword": licence_type.value}}) # type: ignore
+        filters["licence_type"] = {"term": {"licence_type.keyword": licence_type.value}}
 
     query_body = { # type: ignore
-        "from": offset,
         "size": limit,
+        "_source": source,
         "query": {
             "bool": {
                 "must": [
@@ -100,47 +256,421 @@ async def search_prefabs(
                         }
                     }
                 ],
-                "filter": filters
+                # rank_feature queries fail outright on an index without those fields
+                "should": RANKING_BOOSTS if "ranking" not in unsupported_features else [],
+                "filter": list(filters.values())
             }
         }
     }
 
-    response = await opensearch.search(
-        index="prefabs_v1",
-        body=query_body # type: ignore
-    )
+    if facets and cursor is None:
+        _add_facets(query_body, filters) # type: ignore
+
+    if highlight:
+        query_body["highlight"] = {
+            "fields": {
+                "content": {"fragment_size": 150, "number_of_fragments": 2},
+                "description": {"number_of_fragments": 0}
+            }
+        }
+
+    if mode == "hybrid":
+        if embedder.requested and not embedder.installed:
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail="Semantic search needs the fastembed package, which is not installed"
+            )
+        if not embedder.enabled:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Semantic search is not enabled"
+            )
+        if "embedding" in unsupported_features:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Semantic search is unavailable until the search index is rebuilt"
+            )
+        if deep or cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Hybrid search does not support deep paging"
+            )
+
+    if deep or cursor:
+        # Point-in-time pages are tied to one client's PIT, nothing to share
+        response.headers["Cache-Control"] = "no-store"
+        return await _search_deep(query_body, cursor) # type: ignore
+
+    # Keys embed the search generation, so they double as cheap ETags. Without
+    # one (Redis unreachable) the page is neither cached nor revalidated.
+    if mode == "hybrid":
+        key = await cache.search_key({"mode": "hybrid", "q": q, "offset": offset, "query": query_body})
+    else:
+        query_body["from"] = offset
+        key = await cache.search_key(query_body) # type: ignore
+
+    etag = make_etag(key) if key is not None else None
+    unchanged = not_modified(request, etag, CACHE_CONTROL_SEARCH)
+    if unchanged is not None:
+        return unchanged
+    response.headers.update(cache_headers(etag, CACHE_CONTROL_SEARCH))
+
+    if mode == "hybrid":
+        return await _search_hybrid(key, q, query_body, filters, offset) # type: ignore
+
+    async def run_search() -> dict[str, Any]:
+        return await opensearch.search(
+            index=PREFABS_INDEX,
+            body=query_body # type: ignore
+        )
+
+    search_response = await cache.cached(key, CACHE_TTL_SEARCH, run_search)
+
+    result: dict[str, Any] = {
+        "total": search_response["hits"]["total"]["value"],
+        "results": _search_results(search_response)
+    }
+    if "aggregations" in search_response:
+        result["facets"] = _facet_counts(search_response["aggregations"])
+
+    return result
 
-    results = [ # type: ignore
-        {"_id": hit["_id"], **hit["_source"], "_score": hit["_score"]}
-        for hit in response["hits"]["hits"]
-    ]
 
+# Precomputed scores added on top of BM25; rank_feature needs no per-hit scripting
+RANKING_BOOSTS = [
+    {"rank_feature": {"field": "score_quality", "saturation": {"pivot": 0.5}, "boost": RANKING_WEIGHT_QUALITY}},
+    {"rank_feature": {"field": "score_popularity", "saturation": {"pivot": 0.5}, "boost": RANKING_WEIGHT_POPULARITY}},
+    {"rank_feature": {"field": "score_freshness", "saturation": {"pivot": 0.5}, "boost": RANKING_WEIGHT_FRESHNESS}},
+]
+
+
+# Facet name -> field its counts come from
+FACET_FIELDS = {
+    "use_cases": "use_cases.keyword",
+    "categories": "categories.keyword",
+    "licence_type": "licence_type.keyword",
+    "is_free": "is_free",
+}
+
+
+def _add_facets(query_body: dict[str, Any], filters: dict[str, dict[str, Any]]) -> None:
+    """Count facets in the same request, each ignoring its own selection.
+
+    Selected filters move to post_filter so they narrow the hits without
+    narrowing the aggregations; each facet then re-applies the others.
+    """
+    query_body["query"]["bool"]["filter"] = []
+    if filters:
+        query_body["post_filter"] = {"bool": {"filter": list(filters.values())}}
+
+    query_body["aggs"] = {
+        name: {
+            "filter": {"bool": {"filter": [
+                clause for other, clause in filters.items() if other != name
+            ]}},
+            "aggs": {"values": {"terms": {"field": field, "size": 50}}}
+        }
+        for name, field in FACET_FIELDS.items()
+    }
+
+
+def _facet_counts(aggregations: dict[str, Any]) -> dict[str, List[dict[str, Any]]]:
     return {
-        "total": response["hits"]["total"]["value"],
-        "results": results
+        name: [
+            {
+                # Boolean terms come back as 1/0
+                "value": bool(bucket["key"]) if name == "is_free" else bucket["key"],
+                "count": bucket["doc_count"]
+            }
+            for bucket in aggregations[name]["values"]["buckets"]
+        ]
+        for name in FACET_FIELDS
+        if name in aggregations
     }
 
-@router.get("/", response_model=List[Prefab])
-async def get_all_prefabs():
-    prefabs: List[Prefab] = []
 
-    cursor = mongo_db.prefabs.find()
+def _search_results(response: dict[str, Any]) -> List[dict[str, Any]]:
+    results: List[dict[str, Any]] = []
+    for hit in response["hits"]["hits"]:
+        result = {"_id": hit["_id"], **hit["_source"], "_score": hit["_score"]}
+        if "highlight" in hit:
+            result["highlight"] = hit["highlight"]
+        results.append(result)
+    return results
+
+
+# Reciprocal rank fusion constant; larger values flatten the gap between ranks
+RRF_K = 60
+
 
-    async for doc in cursor:
-        prefabs.append(Prefab(**doc))
+def _fuse(responses: List[dict[str, Any]]) -> List[dict[str, Any]]:
+    """Merge ranked hit lists with reciprocal rank fusion.
 
-    return prefabs
+    BM25 and cosine scores are on unrelated scales, so only ranks are
+    combined. A hit keeps the first response's copy, which has highlights.
+    """
+    scores: dict[str, float] = {}
+    hits: dict[str, dict[str, Any]] = {}
+
+    for response in responses:
+        for rank, hit in enumerate(response["hits"]["hits"], start=1):
+            scores[hit["_id"]] = scores.get(hit["_id"], 0.0) + 1 / (RRF_K + rank)
+            hits.setdefault(hit["_id"], hit)
+
+    ranked = sorted(scores, key=lambda hit_id: scores[hit_id], reverse=True)
+    return [{**hits[hit_id], "_score": round(scores[hit_id], 6)} for hit_id in ranked]
+
+
+async def _search_hybrid(
+    key: str | None,
+    q: str,
+    query_body: dict[str, Any],
+    filters: dict[str, dict[str, Any]],
+    offset: int
+) -> dict[str, Any]:
+    """BM25 and k-NN over the same filters in one _msearch, fused by rank."""
+    window = offset + query_body["size"]
+    lexical = {**query_body, "size": window}
+
+    async def run_search() -> dict[str, Any]:
+        try:
+            vector = await embedder.embed_query(q)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Semantic search is unavailable"
+            ) from e
+        semantic = {
+            "size": window,
+            "_source": query_body["_source"],
+            "query": {
+                "knn": {
+                    "embedding": {
+                        "vector": vector,
+                        "k": max(window, HYBRID_KNN_K),
+                        "filter": {"bool": {"filter": list(filters.values())}}
+                    }
+                }
+            }
+        }
+
+        response = await opensearch.msearch(body=[
+            {"index": PREFABS_INDEX}, lexical,
+            {"index": PREFABS_INDEX}, semantic,
+        ])
+        for item in response["responses"]:
+            if "error" in item:
+                raise HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail="Search backend error"
+                )
+
+        hits = _fuse(response["responses"])
+        result: dict[str, Any] = {
+            "total": max(response["responses"][0]["hits"]["total"]["value"], len(hits)),
+            "results": _search_results({"hits": {"hits": hits[offset:window]}})
+        }
+        if "aggregations" in response["responses"][0]:
+            result["facets"] = _facet_counts(response["responses"][0]["aggregations"])
+        return result
+
+    return await cache.cached(key, CACHE_TTL_SEARCH, run_search)
+
+
+async def _search_deep(query_body: dict[str, Any], cursor: str | None) -> dict[str, Any]:
+    """search_after paging over a point in time, so depth does not add cost."""
+    if cursor:
+        try:
+            token = decode_token(cursor)
+            pit_id = token["pit"]
+            search_after = token["after"]
+        except (ValueError, KeyError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    else:
+        pit = await opensearch.create_pit(index=PREFABS_INDEX, keep_alive=SEARCH_PIT_KEEP_ALIVE)
+        pit_id = pit["pit_id"]
+        search_after = None
+
+    body = {
+        **query_body,
+        "pit": {"id": pit_id, "keep_alive": SEARCH_PIT_KEEP_ALIVE},
+        # `id` is a unique keyword, so ties on score still have a stable order
+        "sort": [{"_score": "desc"}, {"id": "asc"}],
+        "track_total_hits": cursor is None
+    }
+    if search_after is not None:
+        body["search_after"] = search_after
+
+    try:
+        response = await opensearch.search(body=body)
+    except NotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Search cursor expired, start a new search"
+        )
+
+    hits = response["hits"]["hits"]
+    next_cursor = None
+    if len(hits) == query_body["size"]:
+        next_cursor = encode_token({
+            "pit": response.get("pit_id", pit_id),
+            "after": hits[-1]["sort"]
+        })
+
+    result: dict[str, Any] = {
+        "results": _search_results(response),
+        "next_cursor": next_cursor
+    }
+    if cursor is None:
+        result["total"] = response["hits"]["total"]["value"]
+    if "aggregations" in response:
+        result["facets"] = _facet_counts(response["aggregations"])
+
+    return result
+
+@router.get("/suggest")
+async def suggest_prefabs(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(5, ge=1, le=10)
+) -> dict[str, Any]:
+    prefix = " ".join(q.lower().split())
+    key = (prefix, limit)
+
+    cached = suggest_cache.get(key)
+    if cached is not None:
+        return cached
+
+    response = await opensearch.search(
+        index=PREFABS_INDEX,
+        body={
+            "size": limit,
+            "track_total_hits": False,
+            "_source": ["name", "creator.username"],
+            "query": {
+                "multi_match": {
+                    "query": prefix,
+                    "fields": ["name.prefix^2", "creator.username.prefix"],
+                    "operator": "and"
+                }
+            }
+        },
+        request_cache=True
+    )
+
+    result = {
+        "suggestions": [
+            {"_id": hit["_id"], **hit["_source"]}
+            for hit in response["hits"]["hits"]
+        ]
+    }
+    suggest_cache.set(key, result)
+
+    return result
+
+@router.get("/", response_model=PrefabPage)
+async def get_all_prefabs(
+    request: Request,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str | None = None
+):
+    try:
+        query = keyset_filter(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    # Any prefab write bumps the version, so a revalidation never touches Mongo
+    version = await cache.prefabs_version()
+    etag = make_etag("prefabs", version, limit, cursor) if version is not None else None
+    unchanged = not_modified(request, etag, CACHE_CONTROL_LIST)
+    if unchanged is not None:
+        return unchanged
+
+    # Fetch one extra document to know whether another page exists
+    docs = await mongo_db.prefabs.find(query).sort(KEYSET_SORT).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1])
+
+    # Validated once here; model_response skips the response_model pass
+    page = PrefabPage.model_validate({"items": docs, "next_cursor": next_cursor})
+    return model_response(page, headers=cache_headers(etag, CACHE_CONTROL_LIST))
+
+@router.post("/batch", response_model=PrefabBatch)
+async def get_prefabs_batch(payload: PrefabBatchRequest):
+    # Duplicates are resolved once; the response keeps first-seen order
+    ids = list(dict.fromkeys(payload.ids))
+    valid = [prefab_id for prefab_id in ids if ObjectId.is_valid(prefab_id)]
+
+    found: dict[str, dict[str, Any]] = {}
+    generations: List[bytes] | None = None
+    if valid:
+        cached_docs, generations = await cache.get_many(
+            [cache.prefab_key(prefab_id) for prefab_id in valid],
+            guards=[cache.prefab_generation_key(prefab_id) for prefab_id in valid]
+        )
+        found = {prefab_id: doc for prefab_id, doc in zip(valid, cached_docs) if doc is not None}
+
+    misses = [ObjectId(prefab_id) for prefab_id in valid if prefab_id not in found]
+    if misses:
+        loaded = {
+            str(doc["_id"]): doc
+            async for doc in mongo_db.prefabs.find({"_id": {"$in": misses}})
+        }
+        # Only written back while each prefab's generation is the one read above
+        if generations is not None:
+            guards = {
+                cache.prefab_key(prefab_id): (cache.prefab_generation_key(prefab_id), generation)
+                for prefab_id, generation in zip(valid, generations)
+            }
+            await cache.set_many(
+                {cache.prefab_key(prefab_id): doc for prefab_id, doc in loaded.items()},
+                CACHE_TTL_PREFAB,
+                guards=guards
+            )
+        found.update(loaded)
+
+    batch = PrefabBatch.model_validate({
+        "items": [found[prefab_id] for prefab_id in ids if prefab_id in found],
+        "missing": [prefab_id for prefab_id in ids if prefab_id not in found],
+    })
+    return model_response(batch)
+
+@router.get("/export")
+async def export_prefabs():
+    async def stream() -> AsyncIterator[bytes]:
+        cursor = mongo_db.prefabs.find().sort(KEYSET_SORT).batch_size(500)
+
+        async for doc in cursor:
+            yield (json.dumps(doc, default=json_default) + "\n").encode()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 @router.get("/{prefab_id}", response_model=Prefab)
-async def get_prefab(prefab_id: str):
+async def get_prefab(prefab_id: str, request: Request):
     if not ObjectId.is_valid(prefab_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid prefab id"
         )
 
-    doc = await mongo_db.prefabs.find_one(
-        {"_id": ObjectId(prefab_id)}
+    async def load_prefab() -> dict[str, Any] | None:
+        return await mongo_db.prefabs.find_one(
+            {"_id": ObjectId(prefab_id)}
+        )
+
+    doc = await cache.cached(
+        cache.prefab_key(prefab_id),
+        CACHE_TTL_PREFAB,
+        load_prefab,
+        guard=cache.prefab_generation_key(prefab_id)
     )
 
     if doc is None:
@@ -149,7 +679,35 @@ async def get_prefab(prefab_id: str):
             detail="Prefab not found"
         )
 
-    return Prefab(**doc)
+    etag = make_etag(prefab_id, doc.get("updated_at") or doc.get("created_at"))
+    unchanged = not_modified(request, etag, CACHE_CONTROL_PREFAB)
+    if unchanged is not None:
+        return unchanged
+
+    return model_response(Prefab.model_validate(doc), headers=cache_headers(etag, CACHE_CONTROL_PREFAB))
+
+@router.get("/{prefab_id}/similar")
+async def get_similar_prefabs(
+    prefab_id: str,
+    limit: int = Query(10, ge=1, le=SIMILAR_TOP_K)
+) -> dict[str, Any]:
+    if not ObjectId.is_valid(prefab_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid prefab id"
+        )
+
+    # Neighbours are precomputed by the similarity job, so this is a single hop
+    async def load_similar() -> List[dict[str, Any]]:
+        return await graph.get_similar(prefab_id, limit)
+
+    similar = await cache.cached(
+        f"cache:{cache.CACHE_VERSION}:similar:{prefab_id}:{limit}",
+        CACHE_TTL_SIMILAR,
+        load_similar
+    )
+
+    return {"results": similar}
 
 @router.patch("/{prefab_id}", response_model=Prefab)
 async def update_prefab(prefab_id: str, payload: PrefabUpdate, user_id: str = Depends(get_current_user_id)):
@@ -166,32 +724,36 @@ async def update_prefab(prefab_id: str, payload: PrefabUpdate, user_id: str = De
             detail="No fields provided for update"
         )
 
-    update_data["updated_at"] = datetime.now(timezone.utc)
+    # Same string form as created_at, so the dashboard's $max compares them in time order
+    update_data["updated_at"] = sortable_timestamp(datetime.now(timezone.utc))
     update_doc = jsonable_encoder(update_data)
 
-    # Restrict update to creator only
-    result = await mongo_db.prefabs.find_one_and_update(
+    # Restrict update to creator only. The previous state tells us which
+    # search fields this edit really changes.
+    before = await mongo_db.prefabs.find_one_and_update(
         {"_id": ObjectId(prefab_id), "creator_id": user_id},
         {"$set": update_doc},
-        return_document=True
+        return_document=ReturnDocument.BEFORE
     )
 
-    if result is None: # type: ignore
+    if before is None: # type: ignore
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Prefab not found or you're not the creator"
         )
-    
-    # after result is returned
-    user_doc = await mongo_db.users.find_one({"_id": ObjectId(user_id)})
 
-    await opensearch.index(
-        index="prefabs_v1",
-        id=str(prefab_id),
-        body=prefab_to_search_doc(Prefab(**result), user_doc["username"]) # type: ignore
-    )
+    changed = indexer.changed_fields(update_doc, before, INDEXED_PREFAB_FIELDS)
+    graph_changed = bool(indexer.changed_fields(update_doc, before, graph.GRAPH_PREFAB_FIELDS))
+
+    # Edits to unindexed fields like external_links skip search, and still
+    # reach the graph when they change its marketplaces
+    if changed or graph_changed:
+        await indexer.enqueue(prefab_id, changed, search=bool(changed), graph=graph_changed)
+    await cache.invalidate_prefab(prefab_id, search=bool(changed))
+    await cache.invalidate_creator(user_id)
+    await cache.bump_prefabs_version()
 
-    return Prefab(**result)
+    return model_response(Prefab.model_validate({**before, **update_doc}))
 
 @router.delete("/{prefab_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_prefab(prefab_id: str, user_id: str = Depends(get_current_user_id)):
@@ -212,11 +774,11 @@ async def delete_prefab(prefab_id: str, user_id: str = Depends(get_current_user_
             detail="Prefab not found or you're not the creator"
         )
     
-    await opensearch.delete(
-        index="prefabs_v1",
-        id=prefab_id
-    )
-    
+    await indexer.enqueue(prefab_id)
+    await cache.invalidate_prefab(prefab_id)
+    await cache.invalidate_creator(user_id)
+    await cache.bump_prefabs_version()
+
     return None
 
 
@@ -1,14 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from bson import ObjectId
 
+from app.core.config import CACHE_TTL_CREATOR, PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
 from app.core.database import mongo_db
-from app.dependencies import get_current_user_id
-from app.models.user import User
+from app.core.responses import model_response
+from app.dependencies import get_current_user, get_current_user_id
+from app.models.prefab import CreatorPrefabPage
+from app.models.user import User, UserProfile
+from app.services import cache, users
+from app.services.pagination import KEYSET_SORT, encode_cursor, keyset_filter
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 users_collection = mongo_db.users
 
+# updated_at is only set once a prefab has been edited
+LAST_CHANGE = {"$max": {"$ifNull": ["$updated_at", "$created_at"]}}
+
+
+def creator_stats_pipeline(user_id: str) -> List[Dict[str, Any]]:
+    """One pass over a creator's prefabs for the totals and per-category counts."""
+    return [
+        {"$match": {"creator_id": user_id}},
+        {"$facet": {
+            "totals": [
+                {"$group": {"_id": None, "count": {"$sum": 1}, "last_updated": LAST_CHANGE}},
+            ],
+            "categories": [
+                {"$unwind": "$categories"},
+                {"$group": {"_id": "$categories", "count": {"$sum": 1}, "last_updated": LAST_CHANGE}},
+                {"$sort": {"count": -1, "_id": 1}},
+            ],
+        }},
+    ]
+
 
 @router.get("/me", response_model=User)
 async def get_me(user_id: str = Depends(get_current_user_id)):
@@ -20,3 +48,63 @@ async def get_me(user_id: str = Depends(get_current_user_id)):
         raise HTTPException(status_code=404, detail="User not found")
 
     return User(**user)
+
+
+@router.get("/me/profile", response_model=UserProfile)
+async def get_my_profile(claims: dict[str, Any] = Depends(get_current_user)):
+    # Served from the shared profile tier, which every login refreshes; the
+    # per-process tier could still hold the profile from before the last login
+    profile = (await users.get_profiles([claims["sub"]], local=False)).get(claims["sub"])
+
+    if not profile:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return UserProfile(**profile)
+
+
+@router.get("/me/prefabs", response_model=CreatorPrefabPage)
+async def get_my_prefabs(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: str | None = None,
+    user_id: str = Depends(get_current_user_id)
+):
+    try:
+        query = {"creator_id": user_id, **keyset_filter(cursor)}
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+    async def load_page() -> dict[str, Any]:
+        # Page read runs on the (creator_id, created_at, _id) index alongside the stats pass
+        docs, stats = await asyncio.gather(
+            mongo_db.prefabs.find(query).sort(KEYSET_SORT).limit(limit + 1).to_list(length=limit + 1),
+            mongo_db.prefabs.aggregate(creator_stats_pipeline(user_id)).to_list(length=1),
+        )
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1])
+
+        totals = stats[0]["totals"][0] if stats[0]["totals"] else {"count": 0, "last_updated": None}
+
+        return {
+            "items": docs,
+            "next_cursor": next_cursor,
+            "total": totals["count"],
+            "last_updated": totals["last_updated"],
+            "categories": [
+                {"category": row["_id"], "count": row["count"], "last_updated": row["last_updated"]}
+                for row in stats[0]["categories"]
+            ],
+        }
+
+    page = await cache.cached(
+        await cache.creator_key(user_id, {"limit": limit, "cursor": cursor}),
+        CACHE_TTL_CREATOR,
+        load_page
+    )
+
+    return model_response(CreatorPrefabPage.model_validate(page))
@@ -0,0 +1,327 @@
+import asyncio
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+from redis.exceptions import RedisError
+
+from app.core.database import redis_client
+from app.services.pagination import json_default
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Bump when the shape of cached values changes so old entries are ignored
+CACHE_VERSION = "v1"
+
+SEARCH_GENERATION_KEY = f"cache:{CACHE_VERSION}:search:gen"
+
+# Bumped by every prefab write; listing ETags are derived from it
+PREFABS_VERSION_KEY = f"cache:{CACHE_VERSION}:prefabs:version"
+
+stats: Dict[str, int] = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0, "stale_writes": 0}
+
+# Loads currently running in this process, so concurrent misses share one backend call
+_inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+# Per-key generations outlive the cached values they guard by a wide margin
+GENERATION_TTL = 24 * 60 * 60
+
+# Write the value only if the guarding generation is still the one read before
+# the load, so a load that raced an invalidation cannot re-cache stale data.
+GUARDED_SET = """
+local current = redis.call('GET', KEYS[1]) or '0'
+if current ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', tonumber(ARGV[3]))
+return 1
+"""
+
+guarded_set = redis_client.register_script(GUARDED_SET)
+
+
+def prefab_key(prefab_id: str) -> str:
+    return f"cache:{CACHE_VERSION}:prefab:{prefab_id}"
+
+
+def prefab_generation_key(prefab_id: str) -> str:
+    return f"cache:{CACHE_VERSION}:prefab:{prefab_id}:gen"
+
+
+def params_hash(params: Dict[str, Any]) -> str:
+    raw = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def creator_generation_key(user_id: str) -> str:
+    return f"cache:{CACHE_VERSION}:creator:{user_id}:gen"
+
+
+async def _generation(key: str) -> Optional[int]:
+    """Current generation, or None when Redis cannot say."""
+    try:
+        generation = await redis_client.get(key)
+    except RedisError:
+        stats["errors"] += 1
+        return None
+
+    return int(generation or 0)
+
+
+async def prefabs_version() -> Optional[int]:
+    """Current collection version, or None when Redis cannot say."""
+    try:
+        version = await redis_client.get(PREFABS_VERSION_KEY)
+    except RedisError:
+        stats["errors"] += 1
+        return None
+
+    return int(version or 0)
+
+
+async def bump_prefabs_version() -> None:
+    try:
+        await redis_client.incr(PREFABS_VERSION_KEY)
+    except RedisError:
+        stats["errors"] += 1
+        logger.warning("Failed to bump prefab collection version")
+
+
+async def search_key(params: Dict[str, Any]) -> Optional[str]:
+    """Search keys embed a generation counter that every prefab write bumps.
+
+    None when the generation is unknown, since any key guessed then could
+    name a page cached before the latest writes.
+    """
+    generation = await _generation(SEARCH_GENERATION_KEY)
+    if generation is None:
+        return None
+    return f"cache:{CACHE_VERSION}:search:{generation}:{params_hash(params)}"
+
+
+async def creator_key(user_id: str, params: Dict[str, Any]) -> Optional[str]:
+    """Per-creator keys, bumped only by that creator's own writes. None like `search_key`."""
+    generation = await _generation(creator_generation_key(user_id))
+    if generation is None:
+        return None
+    return f"cache:{CACHE_VERSION}:creator:{user_id}:{generation}:{params_hash(params)}"
+
+
+async def _store(key: str, value: Any, ttl: int, guard: Optional[Tuple[str, bytes]]) -> None:
+    raw = json.dumps(value, default=json_default)
+
+    if guard is None:
+        await redis_client.set(key, raw, ex=ttl)
+        return
+
+    guard_key, generation = guard
+    if not await guarded_set(keys=[guard_key, key], args=[generation, raw, ttl]):
+        stats["stale_writes"] += 1
+
+
+async def _load_and_store(
+    key: str,
+    ttl: int,
+    loader: Callable[[], Awaitable[Any]],
+    guard: Optional[Tuple[str, bytes]],
+    store: bool,
+) -> Any:
+    value = await loader()
+
+    if value is not None and store:
+        try:
+            await _store(key, value, ttl, guard)
+        except RedisError:
+            stats["errors"] += 1
+            logger.warning("Failed to write cache key %s", key)
+
+    return value
+
+
+async def cached(
+    key: Optional[str],
+    ttl: int,
+    loader: Callable[[], Awaitable[Any]],
+    guard: Optional[str] = None,
+) -> Any:
+    """Read-through lookup. `loader` runs at most once per key per process at a time.
+
+    A loader returning None is treated as "not found" and is not cached. With
+    a `guard` generation key, the result is only written if that generation
+    did not change while loading (see `invalidate_prefab`). Without a `key`
+    the cache is bypassed and `loader` simply runs.
+    """
+    if key is None:
+        stats["misses"] += 1
+        return await loader()
+
+    guard_state: Optional[Tuple[str, bytes]] = None
+    store = True
+    try:
+        if guard is None:
+            raw: Optional[bytes] = await redis_client.get(key)
+        else:
+            raw, generation = await redis_client.mget([key, guard])
+            guard_state = (guard, generation or b"0")
+    except RedisError:
+        stats["errors"] += 1
+        raw = None
+        # The generation is unknown, so the result cannot be written safely
+        store = guard is None
+
+    if raw is not None:
+        stats["hits"] += 1
+        return json.loads(raw)
+
+    stats["misses"] += 1
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_load_and_store(key, ttl, loader, guard_state, store))
+        _inflight[key] = task
+        # An invalidation may already have replaced this entry with a newer load
+        task.add_done_callback(lambda done: _inflight.pop(key) if _inflight.get(key) is done else None)
+    else:
+        stats["coalesced"] += 1
+
+    # Shield so a cancelled request does not cancel the load other requests wait on
+    return await asyncio.shield(task)
+
+
+async def get_many(keys: List[str], guards: Optional[List[str]] = None) -> Tuple[List[Any], Optional[List[bytes]]]:
+    """Values for `keys` in order, None where missing. Counts towards hit/miss stats.
+
+    With `guards`, their generations are read in the same round trip and
+    returned for `set_many`; they are None when Redis could not be read.
+    """
+    try:
+        raw: List[Optional[bytes]] = await redis_client.mget(keys + (guards or []))
+    except RedisError:
+        stats["errors"] += 1
+        raw = [None] * len(keys)
+        guards = None
+
+    values = [json.loads(item) if item is not None else None for item in raw[:len(keys)]]
+    hits = sum(1 for value in values if value is not None)
+    stats["hits"] += hits
+    stats["misses"] += len(keys) - hits
+
+    generations = [item or b"0" for item in raw[len(keys):]] if guards is not None else None
+    return values, generations
+
+
+async def set_many(items: Dict[str, Any], ttl: int, guards: Optional[Dict[str, Tuple[str, bytes]]] = None) -> None:
+    """Write many values. Keys listed in `guards` are written as in `cached`,
+    only if their generation still matches."""
+    if not items:
+        return
+
+    guards = guards or {}
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                raw = json.dumps(value, default=json_default)
+                if key in guards:
+                    guard_key, generation = guards[key]
+                    await guarded_set(keys=[guard_key, key], args=[generation, raw, ttl], client=pipe)
+                else:
+                    pipe.set(key, raw, ex=ttl)
+            results = await pipe.execute()
+    except RedisError:
+        stats["errors"] += 1
+        logger.warning("Failed to write %d cache keys", len(items))
+        return
+
+    stats["stale_writes"] += sum(1 for result in results if result == 0)
+
+
+async def invalidate_search() -> None:
+    try:
+        await redis_client.incr(SEARCH_GENERATION_KEY)
+    except RedisError:
+        stats["errors"] += 1
+        logger.warning("Failed to bump search cache generation")
+
+
+async def invalidate_creator(user_id: str) -> None:
+    try:
+        await redis_client.incr(creator_generation_key(user_id))
+    except RedisError:
+        stats["errors"] += 1
+        logger.warning("Failed to bump cache generation for creator %s", user_id)
+
+
+async def invalidate_prefab(prefab_id: str, search: bool = True) -> None:
+    """Drop the cached detail for one prefab and, unless `search` is False,
+    every cached search page.
+
+    The prefab's generation is bumped before the delete, so a load that read
+    the old document and finishes afterwards fails its guarded write instead
+    of caching the stale copy again.
+    """
+    key = prefab_key(prefab_id)
+    generation_key = prefab_generation_key(prefab_id)
+    _inflight.pop(key, None)
+
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.incr(generation_key)
+            pipe.expire(generation_key, GENERATION_TTL)
+            pipe.delete(key)
+            await pipe.execute()
+    except RedisError:
+        stats["errors"] += 1
+        logger.warning("Failed to delete cache key %s", key)
+
+    if search:
+        await invalidate_search()
+
+
+def get_stats() -> Dict[str, Any]:
+    lookups = stats["hits"] + stats["misses"]
+    return {
+        **stats,
+        "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+        "inflight": len(_inflight),
+    }
+
+
+class LRUCache(Generic[K, V]):
+    """Small in-process LRU whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from typing import Any
+
+import httpx
+
+from app.core.config import (
+    DISCORD_API_BASE,
+    DISCORD_CLIENT_ID,
+    DISCORD_CLIENT_SECRET,
+    DISCORD_MAX_CONNECTIONS,
+    DISCORD_MAX_RETRIES,
+    DISCORD_REDIRECT_URI,
+    DISCORD_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth another attempt; anything else goes straight back to the caller
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# A POST like the code exchange may have gone through even if its response was
+# lost, and an authorization code only works once. Such requests are only
+# retried when they provably never reached Discord, or were rate limited.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+UNSENT_RETRY_STATUSES = {429}
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class DiscordClient:
+    """One keep-alive HTTP/2 connection pool to Discord shared by every login."""
+
+    def __init__(self, base_url: str = DISCORD_API_BASE):
+        self.base_url = base_url
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily too, so the client works outside the app lifespan
+        if self._client is None:
+            self.start()
+        return self._client # type: ignore
+
+    def start(self) -> None:
+        if self._client is not None:
+            return
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=DISCORD_MAX_CONNECTIONS,
+                max_keepalive_connections=DISCORD_MAX_CONNECTIONS,
+                keepalive_expiry=60,
+            ),
+            timeout=httpx.Timeout(DISCORD_TIMEOUT, connect=min(DISCORD_TIMEOUT, 5.0)),
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request, backing off on rate limits, 5xx and connection errors.
+
+        Non-idempotent methods are only retried on rate limits and on errors
+        raised before the request was sent.
+        """
+        if method.upper() in IDEMPOTENT_METHODS:
+            retry_statuses, retry_errors = RETRY_STATUSES, (httpx.TransportError,)
+        else:
+            retry_statuses, retry_errors = UNSENT_RETRY_STATUSES, UNSENT_ERRORS
+
+        for attempt in range(DISCORD_MAX_RETRIES + 1):
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except retry_errors:
+                if attempt == DISCORD_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(0.25 * (2 ** attempt))
+                continue
+
+            if response.status_code not in retry_statuses or attempt == DISCORD_MAX_RETRIES:
+                return response
+
+            logger.warning("Discord returned %d for %s, retrying", response.status_code, url)
+            await asyncio.sleep(self._retry_delay(response, attempt))
+
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _retry_delay(response: httpx.Response, attempt: int) -> float:
+        # Discord sends Retry-After (seconds) with 429s
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), DISCORD_TIMEOUT)
+            except ValueError:
+                pass
+        return 0.25 * (2 ** attempt)
+
+    async def exchange_code(self, code: str) -> httpx.Response:
+        return await self.request(
+            "POST",
+            "/oauth2/token",
+            data={
+                "client_id": DISCORD_CLIENT_ID,
+                "client_secret": DISCORD_CLIENT_SECRET,
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": DISCORD_REDIRECT_URI,
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+
+    async def fetch_user(self, access_token: str) -> httpx.Response:
+        return await self.request(
+            "GET",
+            "/users/@me",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+
+
+discord_client = DiscordClient()
+
@@ -0,0 +1,23 @@
+"""Runs inside the embedding process pool.
+
+Kept free of app imports so worker processes start without the config,
+database clients or routers.
+"""
+from typing import Any, List, Optional
+
+import numpy as np
+
+_model: Optional[Any] = None
+
+
+def load_model(model_name: str) -> None:
+    global _model
+    from fastembed import TextEmbedding
+
+    # One ONNX thread per worker; the pool size sets the parallelism
+    _model = TextEmbedding(model_name, threads=1)
+
+
+def embed(texts: List[str], batch_size: int) -> np.ndarray:
+    assert _model is not None, "load_model() runs as the pool initializer"
+    return np.asarray(list(_model.embed(texts, batch_size=batch_size)), dtype=np.float32)
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+import numpy as np
+from redis.exceptions import RedisError
+
+from app.core.config import (
+    EMBEDDING_BATCH_SIZE, EMBEDDING_CACHE_TTL, EMBEDDING_DIM, EMBEDDING_MODEL,
+    EMBEDDING_WORKERS, QUERY_EMBEDDING_CACHE_SIZE, SEMANTIC_SEARCH_ENABLED
+)
+from app.core.database import redis_client
+from app.models.prefab import Prefab
+from app.services import embedding_worker
+from app.services.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Prefab fields that feed embedding_text()
+EMBEDDED_FIELDS = {"name", "description", "categories", "use_cases", "content"}
+
+# Long content adds little to a small model's vector and costs the most to embed
+MAX_CONTENT_CHARS = 1000
+
+
+def embedding_text(prefab: Prefab) -> str:
+    return "\n".join([
+        prefab.name,
+        prefab.description,
+        ", ".join(c.value for c in prefab.categories),
+        ", ".join(uc.value for uc in prefab.use_cases),
+        prefab.content[:MAX_CONTENT_CHARS],
+    ])
+
+
+def embedding_key(text: str) -> str:
+    # The model is part of the hash so switching models never serves old vectors
+    digest = hashlib.sha1(f"{EMBEDDING_MODEL}\n{text}".encode()).hexdigest()
+    return f"embedding:{digest}"
+
+
+class Embedder:
+    """Local CPU embeddings computed in a process pool, cached by content hash.
+
+    Vectors are stored in Redis as float32 bytes, so unchanged prefabs are
+    never re-embedded by later writes or reindexes.
+    """
+
+    def __init__(self, enabled: bool = SEMANTIC_SEARCH_ENABLED, workers: int = EMBEDDING_WORKERS):
+        # fastembed is an optional extra (requirements-semantic.txt). Without it
+        # the embedder stays off even when semantic search is switched on.
+        self.requested = enabled
+        self.installed = importlib.util.find_spec("fastembed") is not None
+        self.enabled = enabled and self.installed
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._queries: LRUCache[str, np.ndarray] = LRUCache(QUERY_EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_TTL)
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # Created lazily too, so reindex and other CLIs can embed outside the app lifespan
+        if self._pool is None:
+            self.start()
+        return self._pool # type: ignore
+
+    def start(self) -> None:
+        if self.requested and not self.installed:
+            logger.error(
+                "SEMANTIC_SEARCH_ENABLED is set but fastembed is not installed; "
+                "install requirements-semantic.txt to enable hybrid search"
+            )
+        if not self.enabled or self._pool is not None:
+            return
+
+        # spawn, not fork: the parent has event loop and driver threads running
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=embedding_worker.load_model,
+            initargs=(EMBEDDING_MODEL,),
+        )
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def _compute(self, texts: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        chunks = [texts[i:i + EMBEDDING_BATCH_SIZE] for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)]
+
+        # Chunks spread over the pool's workers
+        try:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(self.pool, embedding_worker.embed, chunk, EMBEDDING_BATCH_SIZE)
+                for chunk in chunks
+            ))
+        except BrokenProcessPool:
+            # A crashed worker breaks the whole pool; start a fresh one next time
+            self.close()
+            raise
+        return np.concatenate(results) if results else np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+
+    async def embed_texts(self, texts: List[str]) -> List[np.ndarray]:
+        keys = [embedding_key(text) for text in texts]
+
+        try:
+            cached = await redis_client.mget(keys)
+        except RedisError:
+            cached = [None] * len(keys)
+
+        vectors: Dict[str, np.ndarray] = {
+            key: np.frombuffer(raw, dtype=np.float32)
+            for key, raw in zip(keys, cached) if raw is not None
+        }
+
+        # Identical texts in one batch are embedded once
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if missing:
+            computed = await self._compute(list(missing.values()))
+            fresh = dict(zip(missing, computed))
+            vectors.update(fresh)
+
+            try:
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    for key, vector in fresh.items():
+                        pipe.set(key, vector.tobytes(), ex=EMBEDDING_CACHE_TTL)
+                    await pipe.execute()
+            except RedisError:
+                logger.warning("Failed to cache %d embeddings", len(fresh))
+
+        return [vectors[key] for key in keys]
+
+    async def embed_prefabs(self, prefabs: List[Prefab]) -> List[Optional[List[float]]]:
+        """Vectors for the search documents, or None where embedding is off or failed.
+
+        A failure only costs the semantic half of search for these prefabs;
+        they are still indexed lexically and the next write or reindex retries.
+        """
+        if not self.enabled or not prefabs:
+            return [None] * len(prefabs)
+
+        try:
+            vectors = await self.embed_texts([embedding_text(prefab) for prefab in prefabs])
+        except Exception:
+            logger.exception("Embedding %d prefabs failed, indexing them without vectors", len(prefabs))
+            return [None] * len(prefabs)
+
+        return [vector.tolist() for vector in vectors]
+
+    async def embed_query(self, q: str) -> List[float]:
+        text = " ".join(q.split())
+        vector = self._queries.get(text)
+        if vector is None:
+            vector = (await self.embed_texts([text]))[0]
+            self._queries.set(text, vector)
+        return vector.tolist()
+
+
+embedder = Embedder()
@@ -0,0 +1,312 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from redis.exceptions import ResponseError
+
+from app.core.config import EVENTS_BATCH_SIZE, EVENTS_STREAM, EVENTS_STREAM_MAXLEN
+from app.core.database import mongo_db, neo4j_driver, redis_client
+from app.models.event import Event, EventType
+
+logger = logging.getLogger(__name__)
+
+CONSUMER_GROUP = "event-consumers"
+
+# How long an entry may sit unacknowledged before another consumer takes it over
+RECLAIM_IDLE_MS = 60_000
+
+# Pause after a failed iteration before reading again
+CONSUMER_BACKOFF_SECONDS = 5
+
+# Staged batches waiting to be applied, scored by staging time
+BATCHES_KEY = f"{EVENTS_STREAM}:batches"
+
+# How long a staged batch and its Neo4j marker are kept. A batch still
+# unapplied by then is dropped.
+BATCH_RETENTION_SECONDS = 7 * 24 * 60 * 60
+
+# Recent batch ids remembered on each prefab, so a replayed batch skips
+# prefabs whose clicks it already counted
+APPLIED_BATCHES_KEPT = 50
+
+EVENT_TYPES = {EventType.CLICKED.value, EventType.FAVORITED.value}
+
+# The EventBatch marker is created in the same transaction as the edges, so
+# replaying a batch that already committed changes nothing
+MERGE_INTERACTIONS = """
+MERGE (b:EventBatch {id: $batch_id})
+ON CREATE SET b.created_at = timestamp()
+ON MATCH SET b.replayed = true
+WITH b
+WHERE b.replayed IS NULL
+UNWIND $rows AS row
+MATCH (p:Prefab {id: row.prefab_id})
+MERGE (u:User {id: row.user_id})
+FOREACH (_ IN CASE WHEN row.type = 'clicked' THEN [1] ELSE [] END |
+    MERGE (u)-[r:CLICKED]->(p)
+    ON CREATE SET r.count = 0
+    SET r.count = r.count + row.count, r.last_at = row.last_at
+)
+FOREACH (_ IN CASE WHEN row.type = 'favorited' THEN [1] ELSE [] END |
+    MERGE (u)-[r:FAVORITED]->(p)
+    SET r.last_at = row.last_at
+)
+"""
+
+# A user favorites a prefab once however many events they send, so the
+# counter is the number of FAVORITED edges rather than a sum of events
+COUNT_FAVORITES = """
+UNWIND $ids AS id
+MATCH (p:Prefab {id: id})
+RETURN id, size([(:User)-[:FAVORITED]->(p) | 1]) AS favorites
+"""
+
+PRUNE_BATCH_MARKERS = """
+MATCH (b:EventBatch)
+WHERE b.created_at < $cutoff
+WITH b LIMIT 10000
+DELETE b
+"""
+
+
+def batch_key(batch_id: str) -> str:
+    return f"{EVENTS_STREAM}:batch:{batch_id}"
+
+
+async def publish(user_id: str, events: List[Event]) -> None:
+    """Append events to the Redis stream in one round trip."""
+    now = datetime.now(timezone.utc).isoformat()
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for event in events:
+            pipe.xadd(
+                EVENTS_STREAM,
+                {
+                    "user_id": user_id,
+                    "prefab_id": event.prefab_id,
+                    "type": event.type.value,
+                    "timestamp": event.timestamp.isoformat() if event.timestamp else now,
+                },
+                maxlen=EVENTS_STREAM_MAXLEN,
+                approximate=True,
+            )
+        await pipe.execute()
+
+
+def aggregate(entries: List[Tuple[bytes, Dict[bytes, bytes]]]) -> List[Dict[str, Any]]:
+    """Collapse raw stream entries into one graph row per (user, prefab, type)."""
+    rows: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+
+    for entry_id, fields in entries:
+        try:
+            user_id = fields[b"user_id"].decode()
+            prefab_id = fields[b"prefab_id"].decode()
+            event_type = fields[b"type"].decode()
+            timestamp = fields[b"timestamp"].decode()
+        except (KeyError, UnicodeDecodeError):
+            # Acknowledged with the rest of its batch, so it is not redelivered forever
+            logger.warning("Dropping malformed event %r", entry_id)
+            continue
+
+        if event_type not in EVENT_TYPES or not ObjectId.is_valid(prefab_id):
+            continue
+
+        row = rows.setdefault((user_id, prefab_id, event_type), {
+            "user_id": user_id,
+            "prefab_id": prefab_id,
+            "type": event_type,
+            "count": 0,
+            "last_at": timestamp,
+        })
+        row["count"] += 1
+        row["last_at"] = max(row["last_at"], timestamp)
+
+    return list(rows.values())
+
+
+async def stage(entries: List[Tuple[bytes, Dict[bytes, bytes]]]) -> str | None:
+    """Turn stream entries into a staged batch and acknowledge them, atomically.
+
+    Each entry ends up in exactly one batch, however often the stream delivers
+    it, so batches are the unit that `apply` makes idempotent. Returns the
+    batch id, or None when no entry carried a usable event.
+    """
+    rows = aggregate(entries)
+    batch_id = str(ObjectId())
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        if rows:
+            pipe.set(batch_key(batch_id), json.dumps(rows), ex=BATCH_RETENTION_SECONDS)
+            pipe.zadd(BATCHES_KEY, {batch_id: time.time()})
+        pipe.xack(EVENTS_STREAM, CONSUMER_GROUP, *[entry_id for entry_id, _ in entries])
+        await pipe.execute()
+
+    return batch_id if rows else None
+
+
+async def apply(batch_id: str) -> None:
+    """Apply a staged batch to Neo4j and the Mongo counters, then drop it.
+
+    Safe to repeat after a partial failure: the graph write is guarded by the
+    batch marker, clicks only count on prefabs that do not list the batch yet,
+    and favorites are set from the graph rather than incremented.
+    """
+    raw = await redis_client.get(batch_key(batch_id))
+    if raw is None:
+        # Applied by another worker in the meantime, or past retention
+        await redis_client.zrem(BATCHES_KEY, batch_id)
+        return
+
+    rows: List[Dict[str, Any]] = json.loads(raw)
+    await neo4j_driver.execute_query(MERGE_INTERACTIONS, batch_id=batch_id, rows=rows) # type: ignore
+
+    clicks: Dict[str, int] = {}
+    favorited: List[str] = []
+    for row in rows:
+        if row["type"] == EventType.CLICKED.value:
+            clicks[row["prefab_id"]] = clicks.get(row["prefab_id"], 0) + row["count"]
+        else:
+            favorited.append(row["prefab_id"])
+
+    updates: List[UpdateOne] = [
+        UpdateOne(
+            {"_id": ObjectId(prefab_id), "stats.event_batches": {"$ne": batch_id}},
+            {
+                "$inc": {"stats.clicks": count},
+                "$push": {"stats.event_batches": {"$each": [batch_id], "$slice": -APPLIED_BATCHES_KEPT}},
+            }
+        )
+        for prefab_id, count in clicks.items()
+    ]
+
+    if favorited:
+        records, _, _ = await neo4j_driver.execute_query( # type: ignore
+            COUNT_FAVORITES, ids=list(dict.fromkeys(favorited))
+        )
+        # $max, because a concurrent batch may already have set a newer count
+        updates += [
+            UpdateOne({"_id": ObjectId(record["id"])}, {"$max": {"stats.favorites": record["favorites"]}})
+            for record in records
+        ]
+
+    if updates:
+        await mongo_db.prefabs.bulk_write(updates, ordered=False)
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.zrem(BATCHES_KEY, batch_id)
+        pipe.delete(batch_key(batch_id))
+        await pipe.execute()
+
+
+async def recover(older_than: float, limit: int) -> int:
+    """Apply batches a failed or dead worker staged but never finished."""
+    batch_ids = await redis_client.zrangebyscore(BATCHES_KEY, "-inf", time.time() - older_than, start=0, num=limit)
+
+    for batch_id in batch_ids:
+        await apply(batch_id.decode())
+
+    cutoff = int((time.time() - BATCH_RETENTION_SECONDS) * 1000)
+    await neo4j_driver.execute_query(PRUNE_BATCH_MARKERS, cutoff=cutoff) # type: ignore
+    await redis_client.zremrangebyscore(BATCHES_KEY, "-inf", time.time() - BATCH_RETENTION_SECONDS)
+
+    return len(batch_ids)
+
+
+class EventConsumer:
+    """Drains the interaction stream in batches through a Redis consumer group.
+
+    Entries are staged into batches as they are read, and each batch is then
+    applied idempotently, so redelivery never counts an event twice.
+    """
+
+    def __init__(self, batch_size: int = EVENTS_BATCH_SIZE, block_ms: int = 1000):
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.name = f"{socket.gethostname()}-{os.getpid()}"
+        self._group_ready = False
+        self._task: asyncio.Task[None] | None = None
+
+    async def _ensure_group(self) -> None:
+        try:
+            await redis_client.xgroup_create(EVENTS_STREAM, CONSUMER_GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def consume_once(self, reclaim: bool = False) -> int:
+        if reclaim:
+            # Entries delivered to some consumer (possibly a dead worker) but never acknowledged
+            response = await redis_client.xautoclaim(
+                EVENTS_STREAM,
+                CONSUMER_GROUP,
+                self.name,
+                min_idle_time=RECLAIM_IDLE_MS,
+                start_id="0-0",
+                count=self.batch_size,
+            )
+            entries = response[1]
+        else:
+            response = await redis_client.xreadgroup(
+                CONSUMER_GROUP,
+                self.name,
+                {EVENTS_STREAM: ">"},
+                count=self.batch_size,
+                block=self.block_ms,
+            )
+            entries = response[0][1] if response else []
+
+        if entries:
+            batch_id = await stage(entries)
+            if batch_id is not None:
+                await apply(batch_id)
+
+        if reclaim:
+            await recover(RECLAIM_IDLE_MS / 1000, self.batch_size)
+
+        return len(entries)
+
+    async def run(self) -> None:
+        next_reclaim = 0.0
+
+        while True:
+            try:
+                if not self._group_ready:
+                    await self._ensure_group()
+                    self._group_ready = True
+
+                reclaim = time.monotonic() >= next_reclaim
+                processed = await self.consume_once(reclaim)
+                if reclaim and processed < self.batch_size:
+                    next_reclaim = time.monotonic() + RECLAIM_IDLE_MS / 1000
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Anything else would end the task silently and leave the stream to pile up
+                logger.exception("Event consumer iteration failed")
+                self._group_ready = False
+                await asyncio.sleep(CONSUMER_BACKOFF_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+event_consumer = EventConsumer()
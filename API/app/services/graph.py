@@ -0,0 +1,183 @@
+"""Neo4j projection of prefabs and the SIMILAR_TO recommendations built on it.
+
+Run the similarity job once from the API directory:
+
+    python -m app.services.graph
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+from neo4j import RoutingControl
+
+from app.core.config import SIMILAR_BATCH_SIZE, SIMILAR_INTERVAL, SIMILAR_TOP_K
+from app.core.database import close_all, neo4j_driver
+from app.services.jobs import PeriodicJob
+
+logger = logging.getLogger(__name__)
+
+CONSTRAINTS = [
+    "CREATE CONSTRAINT prefab_id IF NOT EXISTS FOR (p:Prefab) REQUIRE p.id IS UNIQUE",
+    "CREATE CONSTRAINT usecase_name IF NOT EXISTS FOR (u:UseCase) REQUIRE u.name IS UNIQUE",
+    "CREATE CONSTRAINT category_name IF NOT EXISTS FOR (c:Category) REQUIRE c.name IS UNIQUE",
+    "CREATE CONSTRAINT marketplace_name IF NOT EXISTS FOR (m:Marketplace) REQUIRE m.name IS UNIQUE",
+    # Serializes concurrent applications of the same interaction batch
+    "CREATE CONSTRAINT event_batch_id IF NOT EXISTS FOR (b:EventBatch) REQUIRE b.id IS UNIQUE",
+    "CREATE INDEX event_batch_created IF NOT EXISTS FOR (b:EventBatch) ON (b.created_at)",
+]
+
+PROJECT_PREFABS = """
+UNWIND $prefabs AS row
+MERGE (p:Prefab {id: row.id})
+SET p.name = row.name, p.degree = row.degree
+WITH p, row
+OPTIONAL MATCH (p)-[old:POPULAR_IN|IN_CATEGORY|AVAILABLE_ON]->()
+DELETE old
+WITH DISTINCT p, row
+CALL {
+    WITH p, row
+    UNWIND row.use_cases AS name
+    MERGE (u:UseCase {name: name})
+    MERGE (p)-[:POPULAR_IN]->(u)
+}
+CALL {
+    WITH p, row
+    UNWIND row.categories AS name
+    MERGE (c:Category {name: name})
+    MERGE (p)-[:IN_CATEGORY]->(c)
+}
+CALL {
+    WITH p, row
+    UNWIND row.marketplaces AS name
+    MERGE (m:Marketplace {name: name})
+    MERGE (p)-[:AVAILABLE_ON]->(m)
+}
+"""
+
+DELETE_PREFABS = """
+UNWIND $ids AS id
+MATCH (p:Prefab {id: id})
+DETACH DELETE p
+"""
+
+PREFAB_ID_PAGE = """
+MATCH (p:Prefab)
+WHERE p.id > $after
+RETURN p.id AS id
+ORDER BY id
+LIMIT $limit
+"""
+
+# Jaccard overlap of declared features, keeping the top K neighbours per prefab
+COMPUTE_SIMILAR = """
+UNWIND $ids AS id
+MATCH (p:Prefab {id: id})
+OPTIONAL MATCH (p)-[old:SIMILAR_TO]->()
+DELETE old
+WITH DISTINCT p
+CALL {
+    WITH p
+    MATCH (p)-[:POPULAR_IN|IN_CATEGORY|AVAILABLE_ON]->(f)<-[:POPULAR_IN|IN_CATEGORY|AVAILABLE_ON]-(o:Prefab)
+    WHERE o <> p
+    WITH p, o, count(f) AS shared
+    WITH o, toFloat(shared) / (p.degree + o.degree - shared) AS confidence
+    ORDER BY confidence DESC
+    LIMIT $top_k
+    RETURN o, confidence
+}
+MERGE (p)-[s:SIMILAR_TO]->(o)
+SET s.confidence = confidence
+"""
+
+GET_SIMILAR = """
+MATCH (:Prefab {id: $id})-[s:SIMILAR_TO]->(o:Prefab)
+RETURN o.id AS id, o.name AS name, s.confidence AS confidence
+ORDER BY confidence DESC
+LIMIT $limit
+"""
+
+
+async def ensure_constraints() -> None:
+    for constraint in CONSTRAINTS:
+        await neo4j_driver.execute_query(constraint) # type: ignore
+
+
+# Prefab fields read by _graph_row. An edit touching none of them leaves the graph as is.
+GRAPH_PREFAB_FIELDS = {"name", "use_cases", "categories", "external_links"}
+
+
+def _graph_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    use_cases = list(dict.fromkeys(doc.get("use_cases", [])))
+    categories = list(dict.fromkeys(doc.get("categories", [])))
+    marketplaces = list(dict.fromkeys(link["type"] for link in doc.get("external_links", [])))
+
+    return {
+        "id": str(doc["_id"]),
+        "name": doc["name"],
+        "use_cases": use_cases,
+        "categories": categories,
+        "marketplaces": marketplaces,
+        "degree": len(use_cases) + len(categories) + len(marketplaces),
+    }
+
+
+async def project_prefabs(docs: List[Dict[str, Any]], deleted: List[str]) -> None:
+    """Mirror a batch of prefab writes into the graph, one transaction per statement."""
+    if docs:
+        await neo4j_driver.execute_query(PROJECT_PREFABS, prefabs=[_graph_row(doc) for doc in docs]) # type: ignore
+
+    if deleted:
+        await neo4j_driver.execute_query(DELETE_PREFABS, ids=deleted) # type: ignore
+
+
+async def compute_similarity(batch_size: int = SIMILAR_BATCH_SIZE, top_k: int = SIMILAR_TOP_K) -> int:
+    """Rebuild SIMILAR_TO edges for every prefab, a batch of source prefabs at a time."""
+    started = time.perf_counter()
+    after = ""
+    processed = 0
+
+    while True:
+        records, _, _ = await neo4j_driver.execute_query( # type: ignore
+            PREFAB_ID_PAGE,
+            after=after,
+            limit=batch_size,
+            routing_=RoutingControl.READ,
+        )
+        ids = [record["id"] for record in records]
+        if not ids:
+            break
+
+        await neo4j_driver.execute_query(COMPUTE_SIMILAR, ids=ids, top_k=top_k) # type: ignore
+        processed += len(ids)
+        after = ids[-1]
+
+    logger.info("Computed similarity for %d prefabs in %.1fs", processed, time.perf_counter() - started)
+    return processed
+
+
+async def get_similar(prefab_id: str, limit: int) -> List[Dict[str, Any]]:
+    records, _, _ = await neo4j_driver.execute_query( # type: ignore
+        GET_SIMILAR,
+        id=prefab_id,
+        limit=limit,
+        routing_=RoutingControl.READ,
+    )
+    return [record.data() for record in records]
+
+
+similarity_job = PeriodicJob("similarity", SIMILAR_INTERVAL, compute_similarity)
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    try:
+        await ensure_constraints()
+        await compute_similarity()
+    finally:
+        await close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,427 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pydantic import ValidationError
+
+from app.core.config import (
+    INDEXER_BATCH_SIZE,
+    INDEXER_FLUSH_INTERVAL,
+    INDEXER_LEASE_SECONDS,
+    INDEXER_MAX_BACKOFF,
+)
+from app.core.database import mongo_db, opensearch
+from app.models.prefab import Prefab
+from app.services import cache, graph, users
+from app.services.embeddings import EMBEDDED_FIELDS, embedder
+from app.services.openSearch import prefab_to_search_doc, write_targets
+
+logger = logging.getLogger(__name__)
+
+outbox = mongo_db.search_outbox
+
+# The Neo4j projection drains its own outbox, so a graph outage only delays
+# recommendations and never holds back search
+graph_outbox = mongo_db.graph_outbox
+
+
+def backoff_seconds(attempts: int) -> float:
+    return min(INDEXER_MAX_BACKOFF, 0.5 * (2 ** attempts))
+
+
+def changed_fields(update: Dict[str, Any], before: Dict[str, Any], fields: Set[str]) -> List[str]:
+    """Which of `fields` an edit sets to something other than their value in `before`."""
+    return sorted(field for field in fields if field in update and update[field] != before.get(field))
+
+
+async def enqueue(
+    prefab_id: str,
+    fields: Optional[List[str]] = None,
+    search: bool = True,
+    graph: bool = True,
+) -> None:
+    """Record that a prefab changed and its search document and graph node need syncing.
+
+    Entries only carry the id: the workers read the current Mongo state when they
+    flush, so replaying or reordering entries can never index stale data.
+    `fields` narrows an edit to a partial update of those search fields;
+    without it the whole document is indexed. `search` and `graph` leave out
+    the outbox of a side the edit does not touch.
+    """
+    now = datetime.now(timezone.utc)
+    writes: List[Any] = []
+
+    if search:
+        entry: Dict[str, Any] = {"prefab_id": str(prefab_id), "attempts": 0, "available_at": now}
+        if fields is not None:
+            entry["fields"] = sorted(fields)
+        writes.append(outbox.insert_one(entry))
+
+    if graph:
+        writes.append(graph_outbox.insert_one({"prefab_id": str(prefab_id), "attempts": 0, "available_at": now}))
+
+    await asyncio.gather(*writes)
+    if search:
+        search_indexer.notify()
+    if graph:
+        graph_projector.notify()
+
+
+async def enqueue_many(prefab_ids: List[str]) -> None:
+    """Outbox entries for a batch of prefabs in one insert per outbox."""
+    if not prefab_ids:
+        return
+
+    now = datetime.now(timezone.utc)
+    await asyncio.gather(*(
+        collection.insert_many(
+            [{"prefab_id": str(prefab_id), "attempts": 0, "available_at": now} for prefab_id in prefab_ids],
+            ordered=False
+        )
+        for collection in (outbox, graph_outbox)
+    ))
+    search_indexer.notify()
+    graph_projector.notify()
+
+
+async def search_documents(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Search documents for raw prefab documents.
+
+    Creator names come from the profile cache, and vectors are embedded for
+    the whole batch at once in the embedding process pool. Documents that no
+    longer validate are logged and left out, so one bad prefab cannot hold
+    back the rest of its batch; its next edit indexes it again.
+    """
+    prefabs: List[Prefab] = []
+    valid: List[Dict[str, Any]] = []
+    for doc in docs:
+        try:
+            prefabs.append(Prefab(**doc))
+        except ValidationError:
+            logger.exception("Skipping prefab %s, it does not validate", doc.get("_id"))
+            continue
+        valid.append(doc)
+    docs = valid
+
+    usernames, embeddings = await asyncio.gather(
+        users.get_usernames(doc["creator_id"] for doc in docs),
+        embedder.embed_prefabs(prefabs),
+    )
+
+    return [
+        await prefab_to_search_doc(
+            prefab,
+            usernames.get(prefab.creator_id, ""),
+            doc.get("ranking"),
+            embedding
+        )
+        for doc, prefab, embedding in zip(docs, prefabs, embeddings)
+    ]
+
+
+async def index_actions(docs: List[Dict[str, Any]], targets: List[str]) -> List[Dict[str, Any]]:
+    """`_bulk` index lines for raw prefab documents."""
+    actions: List[Dict[str, Any]] = []
+    for search_doc in await search_documents(docs):
+        for index in targets:
+            actions.append({"index": {"_index": index, "_id": search_doc["id"]}})
+            actions.append(search_doc)
+
+    return actions
+
+
+async def current_versions(prefab_ids: List[str], targets: List[str]) -> Dict[Tuple[str, str], Tuple[int, int]]:
+    """(seq_no, primary_term) per (target, prefab id) for documents that exist."""
+    pairs = [(index, prefab_id) for index in targets for prefab_id in prefab_ids]
+    response = await opensearch.mget(body={
+        "docs": [{"_index": index, "_id": prefab_id, "_source": False} for index, prefab_id in pairs]
+    })
+
+    return {
+        pair: (doc["_seq_no"], doc["_primary_term"])
+        for pair, doc in zip(pairs, response["docs"])
+        if doc.get("found")
+    }
+
+
+async def update_actions(
+    docs: List[Dict[str, Any]],
+    fields: Dict[str, Set[str]],
+    targets: List[str]
+) -> List[Dict[str, Any]]:
+    """`_bulk` partial update lines carrying only the changed search fields.
+
+    Each update is conditional on the version read just before, so a write that
+    lands in between makes it fail with a conflict and the outbox retries it
+    against the newer version. Documents missing from a target are indexed whole.
+    """
+    search_docs = await search_documents(docs)
+    versions = await current_versions([doc["id"] for doc in search_docs], targets)
+
+    actions: List[Dict[str, Any]] = []
+    for search_doc in search_docs:
+        changed = fields[search_doc["id"]]
+        partial = {field: search_doc[field] for field in changed if field in search_doc}
+        if changed & EMBEDDED_FIELDS and "embedding" in search_doc:
+            partial["embedding"] = search_doc["embedding"]
+
+        for index in targets:
+            version = versions.get((index, search_doc["id"]))
+            if version is None:
+                actions.append({"index": {"_index": index, "_id": search_doc["id"]}})
+                actions.append(search_doc)
+                continue
+
+            actions.append({"update": {
+                "_index": index,
+                "_id": search_doc["id"],
+                "if_seq_no": version[0],
+                "if_primary_term": version[1],
+            }})
+            actions.append({"doc": partial})
+
+    return actions
+
+
+async def load_changes(prefab_ids: List[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Current Mongo state for changed prefabs, split into live docs and deleted ids."""
+    docs = await mongo_db.prefabs.find(
+        {"_id": {"$in": [ObjectId(pid) for pid in prefab_ids]}}
+    ).to_list(length=None)
+
+    # Missing from Mongo means it was deleted
+    found = {str(doc["_id"]) for doc in docs}
+    deleted = [prefab_id for prefab_id in prefab_ids if prefab_id not in found]
+
+    return docs, deleted
+
+
+async def build_bulk_actions(
+    docs: List[Dict[str, Any]],
+    deleted: List[str],
+    partial: Optional[Dict[str, Set[str]]] = None
+) -> List[Dict[str, Any]]:
+    """`_bulk` action lines bringing every write target in line with Mongo.
+
+    Prefabs in `partial` only had the listed fields edited and get partial
+    updates; the rest are indexed whole.
+    """
+    targets = await write_targets()
+    partial = partial or {}
+
+    actions = [
+        {"delete": {"_index": index, "_id": prefab_id}}
+        for prefab_id in deleted
+        for index in targets
+    ]
+
+    full_docs = [doc for doc in docs if str(doc["_id"]) not in partial]
+    partial_docs = [doc for doc in docs if str(doc["_id"]) in partial]
+
+    actions += await index_actions(full_docs, targets)
+    if partial_docs:
+        actions += await update_actions(partial_docs, partial, targets)
+
+    return actions
+
+
+class OutboxWorker(ABC):
+    """Background worker draining one outbox collection in claimed batches.
+
+    Subclasses implement `process`; entries of prefabs it reports as failed,
+    or of the whole batch when it raises, are retried with backoff.
+    """
+
+    name = "outbox"
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection[Dict[str, Any]],
+        batch_size: int = INDEXER_BATCH_SIZE,
+        flush_interval: float = INDEXER_FLUSH_INTERVAL
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    @abstractmethod
+    async def process(self, prefab_ids: List[str], entries: List[Dict[str, Any]]) -> Set[str]:
+        """Sync the given prefabs and return the ids that failed."""
+
+    async def claim(self) -> List[Dict[str, Any]]:
+        """Lease the oldest available entries to this worker.
+
+        Pushing `available_at` past the lease is the claim: each entry's update
+        only matches while it is still available, so when several API workers
+        poll at once every entry goes to exactly one of them. Entries held by
+        a worker that dies become available again when the lease runs out.
+        """
+        now = datetime.now(timezone.utc)
+        candidates = await self.collection.find(
+            {"available_at": {"$lte": now}}, {"_id": 1}
+        ).sort("_id", 1).limit(self.batch_size).to_list(length=self.batch_size)
+
+        if not candidates:
+            return []
+
+        claim = ObjectId()
+        ids = [candidate["_id"] for candidate in candidates]
+        await self.collection.update_many(
+            {"_id": {"$in": ids}, "available_at": {"$lte": now}},
+            {"$set": {"claim": claim, "available_at": now + timedelta(seconds=INDEXER_LEASE_SECONDS)}}
+        )
+
+        return await self.collection.find({"_id": {"$in": ids}, "claim": claim}).sort("_id", 1).to_list(length=None)
+
+    async def flush_once(self) -> int:
+        entries = await self.claim()
+
+        if not entries:
+            return 0
+
+        prefab_ids = list(dict.fromkeys(entry["prefab_id"] for entry in entries))
+        entry_ids: Dict[str, List[ObjectId]] = {}
+        attempts: Dict[str, int] = {}
+        for entry in entries:
+            prefab_id = entry["prefab_id"]
+            entry_ids.setdefault(prefab_id, []).append(entry["_id"])
+            attempts[prefab_id] = max(attempts.get(prefab_id, 0), entry["attempts"])
+
+        try:
+            failed = await self.process(prefab_ids, entries)
+        except Exception:
+            # Any failure backs the entries off; left to the lease they would
+            # come straight back and fail the same way
+            logger.exception("%s failed, retrying %d prefabs later", self.name, len(prefab_ids))
+            await self._retry(prefab_ids, entry_ids, attempts)
+            return len(entries)
+
+        done = [
+            entry_id
+            for prefab_id in prefab_ids if prefab_id not in failed
+            for entry_id in entry_ids[prefab_id]
+        ]
+
+        if done:
+            await self.collection.delete_many({"_id": {"$in": done}})
+
+        if failed:
+            logger.warning("%s failed for %d prefabs", self.name, len(failed))
+            await self._retry(list(failed), entry_ids, attempts)
+
+        return len(entries)
+
+    async def _retry(self, prefab_ids: List[str], entry_ids: Dict[str, List[ObjectId]], attempts: Dict[str, int]) -> None:
+        now = datetime.now(timezone.utc)
+        for prefab_id in prefab_ids:
+            tries = attempts[prefab_id] + 1
+            await self.collection.update_many(
+                {"_id": {"$in": entry_ids[prefab_id]}},
+                {"$set": {
+                    "attempts": tries,
+                    "available_at": now + timedelta(seconds=backoff_seconds(tries)),
+                }}
+            )
+
+    async def run(self) -> None:
+        while True:
+            try:
+                processed = await self.flush_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("%s iteration failed", self.name)
+                processed = 0
+
+            # A full batch means there is probably more waiting
+            if processed >= self.batch_size:
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            # Give concurrent writes a moment to land in the same batch
+            await asyncio.sleep(0.05)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+class SearchIndexer(OutboxWorker):
+    """Drains the search outbox into OpenSearch `_bulk` requests."""
+
+    name = "Search indexing"
+
+    async def process(self, prefab_ids: List[str], entries: List[Dict[str, Any]]) -> Set[str]:
+        # Several writes to the same prefab collapse into one action; a single
+        # entry without `fields` makes it a full index
+        partial: Dict[str, Set[str]] = {}
+        full: Set[str] = set()
+        for entry in entries:
+            prefab_id = entry["prefab_id"]
+            if "fields" not in entry:
+                full.add(prefab_id)
+                partial.pop(prefab_id, None)
+            elif prefab_id not in full:
+                partial.setdefault(prefab_id, set()).update(entry["fields"])
+
+        docs, deleted = await load_changes(prefab_ids)
+        actions = await build_bulk_actions(docs, deleted, partial)
+        # Empty when every prefab in the batch was skipped as invalid
+        response = await opensearch.bulk(body=actions) if actions else {"items": []} # type: ignore
+
+        failed: Set[str] = set()
+        for item in response["items"]:
+            op, result = next(iter(item.items()))
+            status = result.get("status", 500)
+
+            # Deleting something that was never indexed is fine
+            if status >= 300 and not (op == "delete" and status == 404):
+                failed.add(result["_id"])
+
+        if len(failed) < len(prefab_ids):
+            await cache.invalidate_search()
+
+        return failed
+
+
+class GraphProjector(OutboxWorker):
+    """Drains the graph outbox into batched Neo4j projections.
+
+    The projection is idempotent, so a failed batch is simply retried whole.
+    """
+
+    name = "Graph projection"
+
+    async def process(self, prefab_ids: List[str], entries: List[Dict[str, Any]]) -> Set[str]:
+        docs, deleted = await load_changes(prefab_ids)
+        await graph.project_prefabs(docs, deleted)
+        return set()
+
+
+search_indexer = SearchIndexer(outbox)
+graph_projector = GraphProjector(graph_outbox)
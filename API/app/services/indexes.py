@@ -0,0 +1,137 @@
+"""Declarative Mongo indexes and a query-plan check for the hot queries.
+
+Indexes are created at startup. To create them and verify no hot query
+falls back to a collection scan or an in-memory sort, run from the API directory:
+
+    python -m app.services.indexes --check
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.core.database import close_all, mongo_db
+from app.services.pagination import KEYSET_SORT, keyset_filter, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("discord_id", ASCENDING)], name="discord_id_unique", unique=True),
+    ],
+    "prefabs": [
+        # Matches KEYSET_SORT behind the creator filter, so "my prefabs" pages never sort in memory
+        IndexModel(
+            [("creator_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="creator_created_id",
+        ),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id"),
+    ],
+    "search_outbox": [
+        IndexModel([("available_at", ASCENDING), ("_id", ASCENDING)], name="available_id"),
+    ],
+    "graph_outbox": [
+        IndexModel([("available_at", ASCENDING), ("_id", ASCENDING)], name="available_id"),
+    ],
+}
+
+# Superseded indexes still present on older deployments
+RETIRED_INDEXES: Dict[str, List[str]] = {
+    "prefabs": ["creator_created"],
+}
+
+
+def hot_queries() -> List[Tuple[str, str, Dict[str, Any], List[Tuple[str, int]]]]:
+    """(name, collection, filter, sort) for every query on a request path."""
+    sample_id = ObjectId()
+    sample_time = datetime.now(timezone.utc).isoformat()
+    cursor = encode_cursor({"_id": sample_id, "created_at": sample_time})
+
+    return [
+        ("login upsert", "users", {"discord_id": "123456789012345678"}, []),
+        ("creator update", "prefabs", {"_id": sample_id, "creator_id": str(sample_id)}, []),
+        ("listing first page", "prefabs", {}, KEYSET_SORT),
+        ("listing next page", "prefabs", keyset_filter(cursor), KEYSET_SORT),
+        ("creator listing", "prefabs", {"creator_id": str(sample_id)}, KEYSET_SORT),
+        ("creator listing next page", "prefabs", {"creator_id": str(sample_id), **keyset_filter(cursor)}, KEYSET_SORT),
+        ("outbox poll", "search_outbox", {"available_at": {"$lte": datetime.now(timezone.utc)}}, [("_id", ASCENDING)]),
+        ("graph outbox poll", "graph_outbox", {"available_at": {"$lte": datetime.now(timezone.utc)}}, [("_id", ASCENDING)]),
+    ]
+
+
+async def ensure_indexes() -> None:
+    for collection, models in INDEXES.items():
+        try:
+            await mongo_db[collection].create_indexes(models)
+        except OperationFailure:
+            # e.g. duplicate discord_ids from before the unique index existed
+            logger.exception("Could not create indexes on %s", collection)
+
+    for collection, names in RETIRED_INDEXES.items():
+        existing = await mongo_db[collection].index_information()
+        for name in names:
+            if name in existing:
+                await mongo_db[collection].drop_index(name)
+                logger.info("Dropped retired index %s on %s", name, collection)
+
+
+def _stages(plan: Any) -> List[str]:
+    """Every stage name in an explain() plan tree, whichever engine produced it."""
+    if isinstance(plan, dict):
+        found = [plan["stage"]] if "stage" in plan else []
+        for value in plan.values(): # type: ignore
+            found.extend(_stages(value))
+        return found
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in _stages(item)] # type: ignore
+    return []
+
+
+async def verify_query_plans() -> List[str]:
+    """Names of hot queries whose winning plan scans the whole collection or sorts in memory."""
+    failures: List[str] = []
+
+    for name, collection, query, sort in hot_queries():
+        cursor = mongo_db[collection].find(query).limit(50)
+        if sort:
+            cursor = cursor.sort(sort)
+
+        explain = await cursor.explain()
+        stages = _stages(explain["queryPlanner"]["winningPlan"])
+
+        if "COLLSCAN" in stages:
+            failures.append(name)
+            logger.error("%s on %s uses COLLSCAN: %s", name, collection, stages)
+        elif sort and "SORT" in stages:
+            failures.append(name)
+            logger.error("%s on %s sorts in memory: %s", name, collection, stages)
+        else:
+            logger.info("%s on %s: %s", name, collection, " <- ".join(stages))
+
+    return failures
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Create Mongo indexes")
+    parser.add_argument("--check", action="store_true", help="fail if a hot query falls back to COLLSCAN")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    try:
+        await ensure_indexes()
+        if args.check and await verify_query_plans():
+            return 1
+        return 0
+    finally:
+        await close_all()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
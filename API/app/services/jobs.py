@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from redis.exceptions import RedisError
+
+from app.core.database import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """Run `func` every `interval` seconds in the background.
+
+    A Redis lock held for the interval makes sure only one API worker runs
+    each pass, however many processes start the job. A failed pass is logged
+    and the next one runs on schedule.
+    """
+
+    def __init__(self, name: str, interval: int, func: Callable[[], Awaitable[object]]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._task: asyncio.Task[None] | None = None
+
+    async def run_once(self) -> None:
+        try:
+            acquired = await redis_client.set(f"lock:job:{self.name}", "1", nx=True, ex=self.interval)
+        except RedisError:
+            logger.warning("Skipping %s pass, Redis unavailable", self.name)
+            return
+
+        if acquired:
+            await self.func()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("%s pass failed", self.name)
+
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -1,8 +1,155 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Set
+
+from opensearchpy.exceptions import NotFoundError, RequestError
+from redis.exceptions import RedisError
+
+from app.core.config import EMBEDDING_DIM, PREFABS_INDEX
+from app.core.database import opensearch, redis_client
 from app.models.prefab import Prefab
-from typing import Any, Dict
 
-async def prefab_to_search_doc(prefab: Prefab, creator_username: str) -> Dict[str, Any]:
+logger = logging.getLogger(__name__)
+
+# Set while a reindex is building a new index, so live writes reach it too
+REINDEX_TARGET_KEY = f"reindex:{PREFABS_INDEX}:target"
+
+# Concrete index that deployments from before the alias wrote to directly
+LEGACY_INDEX = f"{PREFABS_INDEX}_v1"
+
+# Fixed name for the first index, so concurrent startups all create the same one
+INITIAL_INDEX = f"{PREFABS_INDEX}_v0"
+
+_keyword_text = {
+    "type": "text",
+    "fields": {"keyword": {"type": "keyword", "ignore_above": 256}},
+}
+
+# Indexed as edge n-grams so a prefix query is a plain term lookup
+_suggest_text = {
+    "type": "text",
+    "fields": {
+        "keyword": {"type": "keyword", "ignore_above": 256},
+        "prefix": {
+            "type": "text",
+            "analyzer": "autocomplete",
+            "search_analyzer": "autocomplete_search",
+        },
+    },
+}
+
+PREFABS_MAPPING: Dict[str, Any] = {
+    "dynamic": False,
+    "properties": {
+        "id": {"type": "keyword"},
+        "name": _suggest_text,
+        "description": {"type": "text"},
+        "content": {"type": "text"},
+
+        "use_cases": _keyword_text,
+        "categories": _keyword_text,
+
+        "licence_type": _keyword_text,
+        "is_free": {"type": "boolean"},
+
+        "creator": {
+            "properties": {
+                "id": {"type": "keyword"},
+                "username": _suggest_text,
+            }
+        },
+
+        "created_at": {"type": "date"},
+
+        # Written by the ranking job, blended into relevance with rank_feature
+        "score_quality": {"type": "rank_feature"},
+        "score_popularity": {"type": "rank_feature"},
+        "score_freshness": {"type": "rank_feature"},
+
+        # Set when semantic search is enabled; unused by lexical queries
+        "embedding": {
+            "type": "knn_vector",
+            "dimension": EMBEDDING_DIM,
+            "method": {"name": "hnsw", "space_type": "cosinesimil", "engine": "lucene"},
+        },
+    },
+}
+
+# Editable prefab fields that also appear, under the same name, in the search
+# document. An edit touching none of them leaves the index untouched.
+INDEXED_PREFAB_FIELDS = {
+    "name", "description", "content", "use_cases", "categories", "licence_type", "is_free",
+}
+
+# rank_feature fields reject zero, so every score keeps a tiny floor
+SCORE_FLOOR = 1e-4
+
+# Fields a search caller may project. `content` is left out by default since
+# highlight fragments cover what a results list needs from it.
+SEARCH_FIELDS = [
+    "id", "name", "description", "content", "use_cases", "categories",
+    "licence_type", "is_free", "creator", "created_at",
+]
+DEFAULT_SEARCH_FIELDS = [field for field in SEARCH_FIELDS if field != "content"]
+
+PREFABS_SETTINGS: Dict[str, Any] = {
+    "number_of_shards": 1,
+    "number_of_replicas": 0,
+    "knn": True,
+    "analysis": {
+        "filter": {
+            "autocomplete_edge": {"type": "edge_ngram", "min_gram": 1, "max_gram": 20},
+        },
+        "analyzer": {
+            "autocomplete": {
+                "type": "custom",
+                "tokenizer": "standard",
+                "filter": ["lowercase", "asciifolding", "autocomplete_edge"],
+            },
+            "autocomplete_search": {
+                "type": "custom",
+                "tokenizer": "standard",
+                "filter": ["lowercase", "asciifolding"],
+            },
+        },
+    },
+}
+
+
+# Fields a legacy index lacks, grouped by the search feature that reads them.
+# Both are additive, so adopting the index maps them in place.
+LEGACY_MAPPING_UPDATES: Dict[str, Dict[str, Any]] = {
+    "ranking": {
+        field: PREFABS_MAPPING["properties"][field]
+        for field in ("score_quality", "score_popularity", "score_freshness")
+    },
+    "embedding": {"embedding": PREFABS_MAPPING["properties"]["embedding"]},
+}
+
+# Features the index behind the alias cannot serve until a reindex, e.g. a
+# legacy index that had `score_*` dynamically mapped as float already
+unsupported_features: Set[str] = set()
+
+
+def search_scores(ranking: Dict[str, float] | None) -> Dict[str, float]:
+    """Flatten a Mongo `ranking` subdocument into the rank_feature fields of the index."""
+    if not ranking:
+        return {}
+
     return {
+        "score_quality": max(ranking["quality_score"], SCORE_FLOOR),
+        "score_popularity": max(ranking["popularity_score"], SCORE_FLOOR),
+        "score_freshness": max(ranking["freshness_score"], SCORE_FLOOR),
+    }
+
+
+async def prefab_to_search_doc(
+    prefab: Prefab,
+    creator_username: str,
+    ranking: Dict[str, float] | None = None,
+    embedding: List[float] | None = None
+) -> Dict[str, Any]:
+    doc: Dict[str, Any] = {
         "id": str(prefab.id),
         "name": prefab.name,
         "description": prefab.description,
@@ -19,5 +166,102 @@ async def prefab_to_search_doc(prefab: Prefab, creator_username: str) -> Dict[st
             "username": creator_username
         },
 
-        "created_at": prefab.created_at.isoformat()
-    }
\ No newline at end of file
+        "created_at": prefab.created_at.isoformat(),
+
+        **search_scores(ranking)
+    }
+
+    if embedding is not None:
+        doc["embedding"] = embedding
+
+    return doc
+
+
+def versioned_index_name() -> str:
+    return f"{PREFABS_INDEX}_v{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+
+
+async def create_versioned_index(name: str, aliases: Dict[str, Any] | None = None, **settings: Any) -> None:
+    body: Dict[str, Any] = {
+        "settings": {**PREFABS_SETTINGS, **settings},
+        "mappings": PREFABS_MAPPING,
+    }
+    if aliases:
+        body["aliases"] = aliases
+
+    await opensearch.indices.create(index=name, body=body)
+
+
+async def aliased_indices() -> List[str]:
+    try:
+        response = await opensearch.indices.get_alias(name=PREFABS_INDEX)
+    except NotFoundError:
+        return []
+    return list(response.keys())
+
+
+async def ensure_index() -> None:
+    """Put an index behind the alias if nothing answers to it yet.
+
+    Without this the first write would auto-create a concrete index named like
+    the alias, with a dynamic mapping, and block any later alias swap. An
+    existing deployment's legacy index is aliased as is, with the ranking and
+    embedding fields mapped onto it, so search keeps its data until a reindex
+    moves it onto the current mapping.
+
+    Every API worker runs this at startup. Aliasing is idempotent and the
+    first index has a fixed name created together with its alias, so racing
+    workers end up with one index behind the alias.
+    """
+    if await opensearch.indices.exists(index=PREFABS_INDEX):
+        if LEGACY_INDEX in await aliased_indices():
+            await update_legacy_mapping()
+        return
+
+    if await opensearch.indices.exists(index=LEGACY_INDEX):
+        await opensearch.indices.put_alias(index=LEGACY_INDEX, name=PREFABS_INDEX)
+        logger.warning(
+            "Aliased legacy index %s as %s; run a reindex to apply the current mapping",
+            LEGACY_INDEX, PREFABS_INDEX
+        )
+        await update_legacy_mapping()
+        return
+
+    try:
+        await create_versioned_index(INITIAL_INDEX, aliases={PREFABS_INDEX: {}})
+    except RequestError as e:
+        # Another worker created it first
+        if e.error != "resource_already_exists_exception":
+            raise
+
+
+async def update_legacy_mapping() -> None:
+    """Map the ranking and embedding fields onto the adopted legacy index.
+
+    A feature whose fields cannot be added (already mapped differently, or
+    the index was not created with k-NN enabled) is recorded in
+    `unsupported_features`, so search leaves it out instead of failing.
+    """
+    for feature, properties in LEGACY_MAPPING_UPDATES.items():
+        try:
+            await opensearch.indices.put_mapping(index=LEGACY_INDEX, body={"properties": properties})
+        except RequestError as e:
+            unsupported_features.add(feature)
+            logger.warning(
+                "Legacy index %s cannot map the %s fields (%s); search runs without them until a reindex",
+                LEGACY_INDEX, feature, e.error
+            )
+        else:
+            unsupported_features.discard(feature)
+
+
+async def write_targets() -> List[str]:
+    """The alias, plus the index a running reindex is building."""
+    try:
+        target = await redis_client.get(REINDEX_TARGET_KEY)
+    except RedisError:
+        target = None
+
+    if target:
+        return [PREFABS_INDEX, target.decode()]
+    return [PREFABS_INDEX]
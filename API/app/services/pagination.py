@@ -0,0 +1,123 @@
+"""Keyset cursors over (created_at, _id).
+
+Prefabs stored before timestamps had one string form may still sort out of
+order. Rewrite them once from the API directory:
+
+    python -m app.services.pagination
+"""
+import asyncio
+import base64
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.core.database import close_all, mongo_db
+from app.models.common import sortable_timestamp
+
+logger = logging.getLogger(__name__)
+
+# What sortable_timestamp produces
+SORTABLE_TIMESTAMP_PATTERN = r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z$"
+
+# Listing order, newest first. Matches the (created_at, _id) keyset below.
+KEYSET_SORT = [("created_at", -1), ("_id", -1)]
+
+
+def encode_token(data: Dict[str, Any]) -> str:
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """Reverse of encode_token. Raises ValueError if malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+    if not isinstance(data, dict):
+        raise ValueError("Invalid cursor")
+    return data # type: ignore
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    """Build an opaque cursor pointing just after `doc` in KEYSET_SORT order."""
+    return encode_token({"c": sortable_timestamp(doc["created_at"]), "i": str(doc["_id"])})
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Turn a cursor back into its keyset values. Raises ValueError if malformed."""
+    data = decode_token(cursor)
+    prefab_id = data.get("i")
+    created_at = data.get("c")
+    if not isinstance(prefab_id, str) or not ObjectId.is_valid(prefab_id) or not isinstance(created_at, str):
+        raise ValueError("Invalid cursor")
+
+    # Also brings cursors issued before the fixed string form onto it
+    return {"created_at": sortable_timestamp(created_at), "_id": ObjectId(prefab_id)}
+
+
+def keyset_filter(cursor: Optional[str]) -> Dict[str, Any]:
+    """Mongo filter selecting documents that sort after `cursor`."""
+    if not cursor:
+        return {}
+
+    after = decode_cursor(cursor)
+
+    # created_at is persisted as a sortable_timestamp string (model_dump(mode="json")),
+    # which sorts the same way as the datetime it came from.
+    return {
+        "$or": [
+            {"created_at": {"$lt": after["created_at"]}},
+            {"created_at": after["created_at"], "_id": {"$lt": after["_id"]}},
+        ]
+    }
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps fallback for raw Mongo documents."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+async def normalize_timestamps(batch_size: int = 1000) -> int:
+    """Rewrite created_at/updated_at values not yet in sortable_timestamp form."""
+    updated = 0
+
+    for field in ("created_at", "updated_at"):
+        query = {field: {"$exists": True, "$ne": None, "$not": {"$regex": SORTABLE_TIMESTAMP_PATTERN}}}
+        updates: list[UpdateOne] = []
+
+        async for doc in mongo_db.prefabs.find(query, {field: 1}).batch_size(batch_size):
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {field: sortable_timestamp(doc[field])}}))
+            if len(updates) == batch_size:
+                await mongo_db.prefabs.bulk_write(updates, ordered=False)
+                updated += len(updates)
+                updates = []
+
+        if updates:
+            await mongo_db.prefabs.bulk_write(updates, ordered=False)
+            updated += len(updates)
+
+    logger.info("Normalized %d timestamps", updated)
+    return updated
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    try:
+        await normalize_timestamps()
+    finally:
+        await close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
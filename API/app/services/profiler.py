@@ -0,0 +1,103 @@
+"""Opt-in sampling profiler that dumps stacks of slow requests.
+
+A background thread samples the event loop thread's stack every
+PROFILE_INTERVAL_MS and tags each sample with the asyncio task that was
+running. When a request takes longer than PROFILE_SLOW_MS, the samples of
+its task are written to PROFILE_DIR in folded format, ready for
+flamegraph.pl or speedscope. Only on-CPU time shows up; time spent waiting
+on backends is in the Server-Timing header and /metrics instead.
+"""
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from types import FrameType
+from typing import Deque, Optional, Tuple
+
+from app.core.config import PROFILE_DIR, PROFILE_INTERVAL_MS, PROFILE_SLOW_MS
+
+logger = logging.getLogger(__name__)
+
+# About a minute of samples at the default interval
+MAX_SAMPLES = 12000
+
+
+def _collapse(frame: Optional[FrameType]) -> str:
+    names = []
+    while frame is not None:
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SlowRequestProfiler:
+    def __init__(self, threshold_ms: int, interval_ms: float, directory: str):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.directory = directory
+        self.samples: Deque[Tuple[float, int, str]] = deque(maxlen=MAX_SAMPLES)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+
+        # Called from the event loop thread, which is the one to sample
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="slow-request-profiler", daemon=True)
+        self._thread.start()
+        logger.info("Profiling requests slower than %.0fms", self.threshold * 1000)
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            task = asyncio.current_task(self._loop)
+            if task is None:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            self.samples.append((time.perf_counter(), id(task), _collapse(frame)))
+
+    async def dump(self, task_id: int, started: float, finished: float, label: str) -> Optional[str]:
+        stacks = Counter(
+            stack for at, task, stack in list(self.samples)
+            if task == task_id and started <= at <= finished
+        )
+        if not stacks:
+            return None
+
+        name = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")
+        path = os.path.join(
+            self.directory,
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{(finished - started) * 1000:.0f}ms.folded"
+        )
+        await asyncio.to_thread(self._write, path, stacks)
+        logger.warning("Slow request %s took %.0fms, stacks in %s", label, (finished - started) * 1000, path)
+        return path
+
+    @staticmethod
+    def _write(path: str, stacks: "Counter[str]") -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+profiler = SlowRequestProfiler(PROFILE_SLOW_MS, PROFILE_INTERVAL_MS, PROFILE_DIR)
@@ -0,0 +1,154 @@
+"""Precomputed ranking signals blended into search relevance.
+
+Run a pass once from the API directory:
+
+    python -m app.services.ranking
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+from app.core.config import (
+    RANKING_BATCH_SIZE,
+    RANKING_FRESHNESS_HALF_LIFE_DAYS,
+    RANKING_INTERVAL,
+)
+from app.core.database import close_all, mongo_db, opensearch
+from app.services import cache
+from app.services.jobs import PeriodicJob
+from app.services.openSearch import SCORE_FLOOR, search_scores, write_targets
+
+logger = logging.getLogger(__name__)
+
+# Pseudo-clicks used to pull favourite rates of rarely seen prefabs towards the mean
+QUALITY_PRIOR_WEIGHT = 20.0
+
+SIGNAL_FIELDS = {"stats": 1, "created_at": 1, "updated_at": 1}
+
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            # Unknown, like any other value that is not a date
+            return 0.0
+    if not isinstance(value, datetime):
+        return 0.0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def compute_scores(
+    clicks: np.ndarray,
+    favorites: np.ndarray,
+    last_changed: np.ndarray,
+    now: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Quality, popularity and freshness in [SCORE_FLOOR, 1] for the whole catalog at once."""
+    popularity = np.log1p(clicks)
+    popularity /= max(popularity.max(initial=0.0), 1.0)
+
+    # Smoothed favourite rate, normalised against the best prefab
+    prior = favorites.sum() / max(clicks.sum(), 1.0)
+    quality = (favorites + prior * QUALITY_PRIOR_WEIGHT) / (clicks + QUALITY_PRIOR_WEIGHT)
+    quality /= max(quality.max(initial=0.0), 1e-9)
+
+    age_days = np.maximum(now - last_changed, 0.0) / 86400.0
+    freshness = np.power(0.5, age_days / RANKING_FRESHNESS_HALF_LIFE_DAYS)
+
+    return (
+        np.clip(quality, SCORE_FLOOR, 1.0),
+        np.clip(popularity, SCORE_FLOOR, 1.0),
+        np.clip(freshness, SCORE_FLOOR, 1.0),
+    )
+
+
+async def load_signals() -> Tuple[List[Any], np.ndarray, np.ndarray, np.ndarray]:
+    ids: List[Any] = []
+    clicks: List[float] = []
+    favorites: List[float] = []
+    last_changed: List[float] = []
+
+    cursor = mongo_db.prefabs.find({}, SIGNAL_FIELDS).batch_size(RANKING_BATCH_SIZE)
+    async for doc in cursor:
+        stats = doc.get("stats") or {}
+        ids.append(doc["_id"])
+        clicks.append(stats.get("clicks", 0))
+        favorites.append(stats.get("favorites", 0))
+        last_changed.append(max(_timestamp(doc.get("created_at")), _timestamp(doc.get("updated_at"))))
+
+    return (
+        ids,
+        np.asarray(clicks, dtype=np.float64),
+        np.asarray(favorites, dtype=np.float64),
+        np.asarray(last_changed, dtype=np.float64),
+    )
+
+
+def ranking_doc(quality: float, popularity: float, freshness: float) -> Dict[str, float]:
+    return {
+        "quality_score": round(quality, 4),
+        "popularity_score": round(popularity, 4),
+        "freshness_score": round(freshness, 4),
+    }
+
+
+async def update_rankings(batch_size: int = RANKING_BATCH_SIZE) -> int:
+    """Recompute every prefab's scores and write them to Mongo and the search index."""
+    started = time.perf_counter()
+
+    ids, clicks, favorites, last_changed = await load_signals()
+    if not ids:
+        return 0
+
+    quality, popularity, freshness = compute_scores(clicks, favorites, last_changed, time.time())
+    targets = await write_targets()
+
+    for start in range(0, len(ids), batch_size):
+        chunk = range(start, min(start + batch_size, len(ids)))
+        rankings = [
+            (ids[i], ranking_doc(float(quality[i]), float(popularity[i]), float(freshness[i])))
+            for i in chunk
+        ]
+
+        await mongo_db.prefabs.bulk_write(
+            [UpdateOne({"_id": prefab_id}, {"$set": {"ranking": ranking}}) for prefab_id, ranking in rankings],
+            ordered=False
+        )
+
+        # Partial updates only touch the score fields; missing docs are skipped
+        actions: List[Dict[str, Any]] = []
+        for prefab_id, ranking in rankings:
+            for index in targets:
+                actions.append({"update": {"_index": index, "_id": str(prefab_id)}})
+                actions.append({"doc": search_scores(ranking)})
+
+        await opensearch.bulk(body=actions) # type: ignore
+
+    await cache.invalidate_search()
+
+    logger.info("Ranked %d prefabs in %.1fs", len(ids), time.perf_counter() - started)
+    return len(ids)
+
+
+ranking_job = PeriodicJob("ranking", RANKING_INTERVAL, update_rankings)
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    try:
+        await update_rankings()
+    finally:
+        await close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
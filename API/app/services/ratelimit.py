@@ -0,0 +1,174 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.config import (
+    RATE_LIMIT_AUTH, RATE_LIMIT_BATCH, RATE_LIMIT_BULK, RATE_LIMIT_DEFAULT, RATE_LIMIT_EVENTS,
+    RATE_LIMIT_LOCAL_SIZE, RATE_LIMIT_SEARCH, RATE_LIMIT_SUGGEST, RATE_LIMIT_WRITE
+)
+from app.core.database import redis_client
+from app.services.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds to stay on the local buckets after Redis fails, instead of retrying every request
+REDIS_RETRY_AFTER = 5.0
+
+# Refill, take and persist in one round trip. Redis' clock is used so every
+# API process agrees on time.
+TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+
+return {allowed, tostring(tokens)}
+"""
+
+token_bucket = redis_client.register_script(TOKEN_BUCKET)
+
+stats: Dict[str, int] = {"allowed": 0, "rejected": 0, "fallback": 0}
+rejected_by_rule: Dict[str, int] = {}
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    path: str
+    capacity: int
+    period: float
+    methods: Optional[FrozenSet[str]] = None
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    def matches(self, method: str, path: str) -> bool:
+        return path.startswith(self.path) and (self.methods is None or method in self.methods)
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int
+    retry_after: int
+
+
+def parse_limit(value: str) -> Tuple[int, float]:
+    """Parse "<requests>/<seconds>", e.g. "60/60"."""
+    requests, _, seconds = value.partition("/")
+    return int(requests), float(seconds or 1)
+
+
+def rule(name: str, path: str, limit: str, methods: Optional[List[str]] = None) -> Rule:
+    capacity, period = parse_limit(limit)
+    return Rule(name, path, capacity, period, frozenset(methods) if methods else None)
+
+
+# First match wins, so specific routes go before the broad ones
+RULES: List[Rule] = [
+    rule("search", "/prefabs/search", RATE_LIMIT_SEARCH, ["GET"]),
+    rule("suggest", "/prefabs/suggest", RATE_LIMIT_SUGGEST, ["GET"]),
+    rule("bulk", "/prefabs/bulk", RATE_LIMIT_BULK, ["POST"]),
+    # A read despite being a POST, with its own bucket so it does not drain "default"
+    rule("batch", "/prefabs/batch", RATE_LIMIT_BATCH, ["POST"]),
+    rule("write", "/prefabs", RATE_LIMIT_WRITE, ["POST", "PATCH", "DELETE"]),
+    rule("events", "/events", RATE_LIMIT_EVENTS, ["POST"]),
+    rule("auth", "/auth", RATE_LIMIT_AUTH),
+    rule("default", "/", RATE_LIMIT_DEFAULT),
+]
+
+EXEMPT_PATHS = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+
+def match_rule(method: str, path: str) -> Optional[Rule]:
+    if method == "OPTIONS" or path.startswith(EXEMPT_PATHS):
+        return None
+    return next((r for r in RULES if r.matches(method, path)), None)
+
+
+class LocalBuckets:
+    """Per-process token buckets, used while Redis is unreachable.
+
+    Limits are only enforced per API process here, which is looser than the
+    shared Redis buckets but keeps a runaway client in check.
+    """
+
+    def __init__(self, maxsize: int):
+        self._buckets: LRUCache[str, Tuple[float, float]] = LRUCache(maxsize, ttl=3600)
+
+    def take(self, key: str, capacity: int, rate: float, cost: int = 1) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key) or (float(capacity), now)
+        tokens = min(capacity, tokens + (now - ts) * rate)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+
+        self._buckets.set(key, (tokens, now), ttl=capacity / rate)
+        return allowed, tokens
+
+
+local_buckets = LocalBuckets(RATE_LIMIT_LOCAL_SIZE)
+_redis_down_until = 0.0
+
+
+async def _take(key: str, r: Rule) -> Tuple[bool, float]:
+    global _redis_down_until
+
+    if time.monotonic() >= _redis_down_until:
+        try:
+            allowed, tokens = await token_bucket(keys=[key], args=[r.capacity, r.rate, 1])
+            return bool(allowed), float(tokens)
+        except RedisError as e:
+            logger.warning("Rate limiter falling back to local buckets: %s", e)
+            _redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+
+    stats["fallback"] += 1
+    return local_buckets.take(key, r.capacity, r.rate)
+
+
+async def check(r: Rule, identity: str) -> Decision:
+    allowed, tokens = await _take(f"ratelimit:{r.name}:{identity}", r)
+
+    if allowed:
+        stats["allowed"] += 1
+    else:
+        stats["rejected"] += 1
+        rejected_by_rule[r.name] = rejected_by_rule.get(r.name, 0) + 1
+
+    return Decision(
+        allowed=allowed,
+        limit=r.capacity,
+        remaining=max(0, math.floor(tokens)),
+        reset=math.ceil((r.capacity - tokens) / r.rate),
+        retry_after=0 if allowed else max(1, math.ceil((1 - tokens) / r.rate)),
+    )
+
+
+def get_stats() -> Dict[str, object]:
+    return {**stats, "rejected_by_rule": dict(rejected_by_rule)}
@@ -0,0 +1,194 @@
+"""Rebuild the prefab search index and swap the read alias onto it.
+
+Run from the API directory:
+
+    python -m app.services.reindex [--batch-size 1000] [--concurrency 4] [--delete-old]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Set
+
+from bson import ObjectId
+
+from app.core.config import PREFABS_INDEX, REINDEX_BATCH_SIZE, REINDEX_CONCURRENCY
+from app.core.database import close_all, mongo_db, opensearch, redis_client
+from app.services.embeddings import embedder
+from app.services.indexer import index_actions
+from app.services.openSearch import (
+    REINDEX_TARGET_KEY,
+    aliased_indices,
+    create_versioned_index,
+    versioned_index_name,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Passes over the prefabs whose bulk items failed before the swap is abandoned
+REINDEX_RETRIES = 3
+
+
+class ReindexError(RuntimeError):
+    pass
+
+
+class ReindexProgress:
+    def __init__(self, total: int):
+        self.total = total
+        self.indexed = 0
+        self.skipped = 0
+        self.failed: Set[str] = set()
+        self.started = time.perf_counter()
+
+    def report(self) -> None:
+        elapsed = time.perf_counter() - self.started
+        rate = self.indexed / elapsed if elapsed else 0.0
+        logger.info(
+            "Indexed %d/%d prefabs (%d failed, %d invalid) in %.1fs, %.0f docs/s",
+            self.indexed, self.total, len(self.failed), self.skipped, elapsed, rate
+        )
+
+
+async def _send_batch(docs: List[Dict[str, Any]], index: str, progress: ReindexProgress) -> None:
+    actions = await index_actions(docs, [index])
+    # Prefabs that no longer validate are left out of the actions
+    progress.skipped += len(docs) - len(actions) // 2
+    if not actions:
+        return
+
+    response = await opensearch.bulk(body=actions) # type: ignore
+
+    for item in response["items"]:
+        result = item["index"]
+        if result.get("status", 500) >= 300:
+            progress.failed.add(result["_id"])
+            logger.warning("Indexing prefab %s failed: %s", result["_id"], result.get("error"))
+        else:
+            progress.failed.discard(result["_id"])
+            progress.indexed += 1
+    progress.report()
+
+
+async def _retry_failed(index: str, progress: ReindexProgress) -> None:
+    for attempt in range(1, REINDEX_RETRIES + 1):
+        if not progress.failed:
+            return
+
+        await asyncio.sleep(2 ** attempt)
+        logger.info("Retrying %d failed prefabs (attempt %d)", len(progress.failed), attempt)
+        docs = await mongo_db.prefabs.find(
+            {"_id": {"$in": [ObjectId(prefab_id) for prefab_id in progress.failed]}}
+        ).to_list(length=None)
+
+        # Deleted since the first pass, so there is nothing left to index
+        progress.failed &= {str(doc["_id"]) for doc in docs}
+        if docs:
+            await _send_batch(docs, index, progress)
+
+
+async def reindex(
+    batch_size: int = REINDEX_BATCH_SIZE,
+    concurrency: int = REINDEX_CONCURRENCY,
+    delete_old: bool = False,
+) -> str:
+    """Build a fresh versioned index from Mongo and point the alias at it.
+
+    Returns the new index name. The alias keeps serving the old index until the
+    final atomic swap, and live writes are mirrored into the new index meanwhile.
+    Prefabs whose bulk items fail are retried; if any still fail, the new index
+    is dropped and the alias is left where it was.
+    """
+    new_index = versioned_index_name()
+
+    # Skip refreshes and replicas while bulk loading
+    await create_versioned_index(new_index, refresh_interval="-1")
+    await redis_client.set(REINDEX_TARGET_KEY, new_index, ex=60 * 60 * 24)
+
+    old_indices: List[str] = []
+    try:
+        progress = ReindexProgress(await mongo_db.prefabs.estimated_document_count())
+        semaphore = asyncio.Semaphore(concurrency)
+        pending: set[asyncio.Task[None]] = set()
+
+        async def send(batch: List[Dict[str, Any]]) -> None:
+            try:
+                await _send_batch(batch, new_index, progress)
+            finally:
+                semaphore.release()
+
+        batch: List[Dict[str, Any]] = []
+        async for doc in mongo_db.prefabs.find().sort("_id", 1).batch_size(batch_size):
+            batch.append(doc)
+            if len(batch) < batch_size:
+                continue
+
+            # Bounded concurrency: wait for a free slot before reading further
+            await semaphore.acquire()
+            task = asyncio.create_task(send(batch))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            batch = []
+
+        if batch:
+            await semaphore.acquire()
+            pending.add(asyncio.create_task(send(batch)))
+
+        await asyncio.gather(*pending)
+        await _retry_failed(new_index, progress)
+
+        if not progress.failed:
+            await opensearch.indices.put_settings(
+                index=new_index,
+                body={"index": {"refresh_interval": "1s"}}
+            )
+            await opensearch.indices.refresh(index=new_index)
+
+            old_indices = await aliased_indices()
+            await opensearch.indices.update_aliases(body={
+                "actions": [
+                    *({"remove": {"index": old, "alias": PREFABS_INDEX}} for old in old_indices),
+                    {"add": {"index": new_index, "alias": PREFABS_INDEX}},
+                ]
+            })
+    finally:
+        await redis_client.delete(REINDEX_TARGET_KEY)
+
+    if progress.failed:
+        # Live writes stopped mirroring into it above, so it can go
+        await opensearch.indices.delete(index=new_index)
+        raise ReindexError(
+            f"{len(progress.failed)} prefabs could not be indexed; "
+            f"dropped {new_index} and left {PREFABS_INDEX} unchanged"
+        )
+
+    progress.report()
+    logger.info("Alias %s now points at %s", PREFABS_INDEX, new_index)
+
+    if delete_old:
+        for old in old_indices:
+            await opensearch.indices.delete(index=old)
+            logger.info("Deleted old index %s", old)
+
+    return new_index
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the prefab search index")
+    parser.add_argument("--batch-size", type=int, default=REINDEX_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=REINDEX_CONCURRENCY)
+    parser.add_argument("--delete-old", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    try:
+        await reindex(args.batch_size, args.concurrency, args.delete_old)
+    finally:
+        embedder.close()
+        await close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+import json
+import logging
+from typing import Any, Dict, Iterable, List
+
+from bson import ObjectId
+from redis.exceptions import RedisError
+
+from app.core.config import (
+    USER_CACHE_REDIS_TTL,
+    USER_CACHE_SIZE,
+    USER_CACHE_TTL,
+)
+from app.core.database import mongo_db, opensearch, redis_client
+from app.services import cache
+from app.services.cache import CACHE_VERSION, LRUCache
+from app.services.openSearch import write_targets
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a username rewrite across a creator's indexed prefabs
+PROPAGATE_TIMEOUT = 300
+
+# Only the fields the rest of the app needs from a user document
+PROFILE_FIELDS = {"username": 1, "discord_id": 1, "avatar": 1}
+
+# First tier, per process. Kept short lived because other workers can change
+# the second tier without telling us.
+profiles: LRUCache[str, Dict[str, Any]] = LRUCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+
+def profile_key(user_id: str) -> str:
+    return f"cache:{CACHE_VERSION}:user:{user_id}"
+
+
+def _profile(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(doc["_id"]),
+        "username": doc["username"],
+        "discord_id": doc.get("discord_id"),
+        "avatar": doc.get("avatar"),
+    }
+
+
+async def remember_profile(doc: Dict[str, Any]) -> None:
+    """Store an authoritative profile (fresh from Mongo) in both tiers."""
+    profile = _profile(doc)
+    profiles.set(profile["id"], profile)
+
+    try:
+        await redis_client.set(profile_key(profile["id"]), json.dumps(profile), ex=USER_CACHE_REDIS_TTL)
+    except RedisError:
+        logger.warning("Failed to cache profile for user %s", profile["id"])
+
+
+async def get_profiles(user_ids: Iterable[str], local: bool = True) -> Dict[str, Dict[str, Any]]:
+    """Resolve profiles through the LRU, then Redis, then one Mongo `$in` query.
+
+    `local=False` skips the LRU, for callers that must see a login handled
+    by another worker straight away.
+    """
+    found: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+
+    for user_id in dict.fromkeys(user_ids):
+        profile = profiles.get(user_id) if local else None
+        if profile is None:
+            missing.append(user_id)
+        else:
+            found[user_id] = profile
+
+    if not missing:
+        return found
+
+    try:
+        cached = await redis_client.mget([profile_key(user_id) for user_id in missing])
+    except RedisError:
+        cached = [None] * len(missing)
+
+    still_missing: List[str] = []
+    for user_id, raw in zip(missing, cached):
+        if raw is None:
+            still_missing.append(user_id)
+            continue
+
+        profile = json.loads(raw)
+        profiles.set(user_id, profile)
+        found[user_id] = profile
+
+    object_ids = [ObjectId(user_id) for user_id in still_missing if ObjectId.is_valid(user_id)]
+    if object_ids:
+        async for doc in mongo_db.users.find({"_id": {"$in": object_ids}}, PROFILE_FIELDS):
+            await remember_profile(doc)
+            found[str(doc["_id"])] = _profile(doc)
+
+    return found
+
+
+async def get_usernames(user_ids: Iterable[str]) -> Dict[str, str]:
+    return {
+        user_id: profile["username"]
+        for user_id, profile in (await get_profiles(user_ids)).items()
+    }
+
+
+async def propagate_username(user_id: str, username: str) -> None:
+    """Rewrite the denormalized `creator.username` on every indexed prefab of a user.
+
+    Waits for the rewrite and its refresh before dropping cached searches, so
+    the new search generation cannot be filled from the old documents. Run it
+    in the background; it takes as long as the creator has prefabs.
+    """
+    for index in await write_targets():
+        await opensearch.update_by_query( # type: ignore
+            index=index,
+            body={
+                "query": {"term": {"creator.id": user_id}},
+                "script": {
+                    "source": "ctx._source.creator.username = params.username",
+                    "lang": "painless",
+                    "params": {"username": username},
+                },
+            },
+            conflicts="proceed",
+            refresh=True,
+            request_timeout=PROPAGATE_TIMEOUT,
+        )
+
+    await cache.invalidate_search()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+# App modules read these at import time; clients connect lazily, so nothing is contacted
+for name, value in {
+    "MONGO_URI": "mongodb://localhost:27017/prefabs",
+    "NEO4J_URI": "bolt://localhost:7687",
+    "NEO4J_USER": "neo4j",
+    "NEO4J_PASSWORD": "devpassword",
+    "OPENSEARCH_HOST": "http://localhost:9200",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "DISCORD_CLIENT_ID": "test",
+    "DISCORD_CLIENT_SECRET": "test",
+    "JWT_SECRET": "test-secret",
+}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
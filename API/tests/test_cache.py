@@ -0,0 +1,122 @@
+"""Guarded cache writes and the unknown-generation bypass, against fakeredis."""
+import asyncio
+from typing import Any, Awaitable, Callable
+from unittest import mock
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.services import cache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _run(monkeypatch: pytest.MonkeyPatch, test: Callable[[Any], Awaitable[None]]) -> None:
+    async def main() -> None:
+        client = fakeredis.aioredis.FakeRedis()
+        monkeypatch.setattr(cache, "redis_client", client)
+        monkeypatch.setattr(cache, "guarded_set", client.register_script(cache.GUARDED_SET))
+        await test(client)
+
+    asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cache, "stats", dict.fromkeys(cache.stats, 0))
+    monkeypatch.setattr(cache, "_inflight", {})
+
+
+def test_guarded_load_is_cached(monkeypatch: pytest.MonkeyPatch):
+    async def test(client: Any) -> None:
+        key = cache.prefab_key("p1")
+        value = await cache.cached(key, 60, mock.AsyncMock(return_value={"name": "Door"}), cache.prefab_generation_key("p1"))
+
+        assert value == {"name": "Door"}
+        assert await client.get(key) == b'{"name": "Door"}'
+
+    _run(monkeypatch, test)
+
+
+def test_load_racing_an_invalidation_is_not_cached(monkeypatch: pytest.MonkeyPatch):
+    async def test(client: Any) -> None:
+        key = cache.prefab_key("p1")
+
+        async def loader() -> dict[str, str]:
+            # The prefab is edited while the old copy is being read
+            await cache.invalidate_prefab("p1", search=False)
+            return {"name": "Old door"}
+
+        value = await cache.cached(key, 60, loader, cache.prefab_generation_key("p1"))
+
+        assert value == {"name": "Old door"}
+        assert await client.get(key) is None
+        assert cache.stats["stale_writes"] == 1
+
+    _run(monkeypatch, test)
+
+
+def test_set_many_skips_stale_generations(monkeypatch: pytest.MonkeyPatch):
+    async def test(client: Any) -> None:
+        keys = [cache.prefab_key("p1"), cache.prefab_key("p2")]
+        guards = [cache.prefab_generation_key("p1"), cache.prefab_generation_key("p2")]
+        _, generations = await cache.get_many(keys, guards)
+        assert generations == [b"0", b"0"]
+
+        await cache.invalidate_prefab("p2", search=False)
+        await cache.set_many(
+            {keys[0]: {"id": "p1"}, keys[1]: {"id": "p2"}},
+            60,
+            {key: (guard, generation) for key, guard, generation in zip(keys, guards, generations)}
+        )
+
+        assert await client.get(keys[0]) is not None
+        assert await client.get(keys[1]) is None
+        assert cache.stats["stale_writes"] == 1
+
+    _run(monkeypatch, test)
+
+
+def test_search_key_follows_generation(monkeypatch: pytest.MonkeyPatch):
+    async def test(client: Any) -> None:
+        before = await cache.search_key({"q": "door"})
+        await cache.invalidate_search()
+        after = await cache.search_key({"q": "door"})
+
+        assert before is not None and after is not None
+        assert before != after
+
+    _run(monkeypatch, test)
+
+
+def test_unknown_generation_bypasses_cache(monkeypatch: pytest.MonkeyPatch):
+    async def test(client: Any) -> None:
+        monkeypatch.setattr(client, "get", mock.AsyncMock(side_effect=ConnectionError("down")))
+        monkeypatch.setattr(client, "set", mock.AsyncMock())
+
+        key = await cache.search_key({"q": "door"})
+        assert key is None
+        assert await cache.creator_key("u1", {"limit": 20}) is None
+
+        loader = mock.AsyncMock(return_value={"total": 0})
+        assert await cache.cached(key, 60, loader) == {"total": 0}
+        assert await cache.cached(key, 60, loader) == {"total": 0}
+
+        # Nothing read or written under a guessed key
+        assert loader.await_count == 2
+        client.set.assert_not_awaited()
+
+    _run(monkeypatch, test)
+
+
+def test_unreadable_guard_loads_without_storing(monkeypatch: pytest.MonkeyPatch):
+    async def test(client: Any) -> None:
+        monkeypatch.setattr(client, "mget", mock.AsyncMock(side_effect=ConnectionError("down")))
+        key = cache.prefab_key("p1")
+
+        value = await cache.cached(key, 60, mock.AsyncMock(return_value={"id": "p1"}), cache.prefab_generation_key("p1"))
+
+        assert value == {"id": "p1"}
+        assert await client.exists(key) == 0
+
+    _run(monkeypatch, test)
@@ -0,0 +1,174 @@
+"""/auth/discord/callback against scripts/stub_discord.py.
+
+Run from the API directory:
+
+    python -m pytest tests
+"""
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, Iterator, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pymongo import ReturnDocument
+
+from app.routers import auth
+from app.services.discord import DiscordClient
+
+STUB_SCRIPT = os.path.join(os.path.dirname(__file__), "..", "..", "scripts", "stub_discord.py")
+
+
+class FakeUsers:
+    """Just enough of the users collection for the callback's upsert."""
+
+    def __init__(self):
+        self.docs: List[Dict[str, Any]] = []
+
+    async def find_one_and_update(
+        self,
+        filter: Dict[str, Any],
+        update: Dict[str, Any],
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.BEFORE,
+    ) -> Dict[str, Any] | None:
+        assert return_document == ReturnDocument.BEFORE
+
+        for doc in self.docs:
+            if all(doc.get(field) == value for field, value in filter.items()):
+                previous = dict(doc)
+                doc.update(update["$set"])
+                return previous
+
+        if upsert:
+            self.docs.append({**filter, **update["$set"], **update["$setOnInsert"]})
+        return None
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_stub(*args: str) -> tuple[subprocess.Popen[bytes], str]:
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, STUB_SCRIPT, "--port", str(port), *args],
+        stdout=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("Stub Discord server did not start")
+            time.sleep(0.05)
+
+
+@pytest.fixture
+def users(monkeypatch: pytest.MonkeyPatch) -> FakeUsers:
+    fake = FakeUsers()
+    monkeypatch.setattr(auth, "users_collection", fake)
+    return fake
+
+
+def _client(monkeypatch: pytest.MonkeyPatch, *stub_args: str) -> Iterator[TestClient]:
+    process, base_url = _start_stub(*stub_args)
+    monkeypatch.setattr(auth, "discord_client", DiscordClient(base_url=base_url))
+
+    app = FastAPI()
+    app.include_router(auth.router)
+    try:
+        # One event loop for the whole test, so the Discord connection pool is reused
+        with TestClient(app) as client:
+            yield client
+            client.portal.call(auth.discord_client.close)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch, users: FakeUsers) -> Iterator[TestClient]:
+    yield from _client(monkeypatch)
+
+
+@pytest.fixture
+def rate_limited_client(monkeypatch: pytest.MonkeyPatch, users: FakeUsers) -> Iterator[TestClient]:
+    # The token exchange goes through, the user fetch is answered with a 429 first
+    yield from _client(monkeypatch, "--rate-limit-every", "2")
+
+
+@pytest.fixture
+def flaky_token_client(monkeypatch: pytest.MonkeyPatch, users: FakeUsers) -> Iterator[TestClient]:
+    yield from _client(monkeypatch, "--token-errors", "1")
+
+
+def test_first_login_creates_user(client: TestClient, users: FakeUsers):
+    res = client.get("/auth/discord/callback", params={"code": "alice"})
+
+    assert res.status_code == 200
+    body = res.json()
+    assert body["token_type"] == "bearer"
+    assert body["user"]["username"] == "alice"
+    assert len(users.docs) == 1
+    assert str(users.docs[0]["_id"]) == body["user"]["_id"]
+
+
+def test_second_login_updates_same_user(client: TestClient, users: FakeUsers):
+    first = client.get("/auth/discord/callback", params={"code": "alice"}).json()
+    second = client.get("/auth/discord/callback", params={"code": "alice"}).json()
+
+    assert len(users.docs) == 1
+    assert second["user"]["_id"] == first["user"]["_id"]
+    assert second["user"]["discord_id"] == first["user"]["discord_id"]
+    assert second["user"]["last_login"] >= first["user"]["last_login"]
+
+
+def test_rejected_code(client: TestClient, users: FakeUsers):
+    res = client.get("/auth/discord/callback", params={"code": "invalid"})
+
+    assert res.status_code == 400
+    assert users.docs == []
+
+
+def test_rate_limited_login_is_retried(
+    rate_limited_client: TestClient,
+    users: FakeUsers,
+    caplog: pytest.LogCaptureFixture,
+):
+    with caplog.at_level(logging.WARNING, logger="app.services.discord"):
+        res = rate_limited_client.get("/auth/discord/callback", params={"code": "bob"})
+
+    assert res.status_code == 200
+    assert res.json()["user"]["username"] == "bob"
+    assert len(users.docs) == 1
+    assert any("Discord returned 429" in record.getMessage() for record in caplog.records)
+
+
+def test_token_exchange_5xx_is_not_retried(
+    flaky_token_client: TestClient,
+    users: FakeUsers,
+    caplog: pytest.LogCaptureFixture,
+):
+    # A retry would spend the single-use code a second time
+    with caplog.at_level(logging.WARNING, logger="app.services.discord"):
+        res = flaky_token_client.get("/auth/discord/callback", params={"code": "carol"})
+
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Discord token exchange failed"
+    assert not any("Discord returned" in record.getMessage() for record in caplog.records)
+    assert users.docs == []
+
+    # The stub only fails once, so signing in again works
+    res = flaky_token_client.get("/auth/discord/callback", params={"code": "carol"})
+    assert res.status_code == 200
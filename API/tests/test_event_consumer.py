@@ -0,0 +1,52 @@
+import asyncio
+import logging
+from unittest import mock
+
+import pytest
+
+from app.services import events
+
+
+def test_aggregate_drops_malformed_entries():
+    entries = [
+        (b"1-0", {b"user_id": b"u1", b"prefab_id": b"0" * 24, b"type": b"clicked", b"timestamp": b"2026-01-01"}),
+        (b"2-0", {b"user_id": b"u1", b"type": b"clicked"}),
+        (b"3-0", {b"user_id": b"u1", b"prefab_id": b"0" * 24, b"type": b"clicked", b"timestamp": b"2026-01-02"}),
+    ]
+
+    rows = events.aggregate(entries)
+
+    assert rows == [{
+        "user_id": "u1",
+        "prefab_id": "0" * 24,
+        "type": "clicked",
+        "count": 2,
+        "last_at": "2026-01-02",
+    }]
+
+
+def test_consumer_survives_unexpected_errors(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture):
+    consumer = events.EventConsumer()
+    consumer._group_ready = True
+    monkeypatch.setattr(consumer, "_ensure_group", mock.AsyncMock())
+    monkeypatch.setattr(events, "CONSUMER_BACKOFF_SECONDS", 0)
+
+    calls = 0
+
+    async def consume_once(reclaim: bool) -> int:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise KeyError("user_id")
+        if calls == 2:
+            raise TimeoutError()
+        raise asyncio.CancelledError()
+
+    monkeypatch.setattr(consumer, "consume_once", consume_once)
+
+    with caplog.at_level(logging.ERROR, logger="app.services.events"):
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(consumer.run())
+
+    assert calls == 3
+    assert len([r for r in caplog.records if "Event consumer iteration failed" in r.getMessage()]) == 2
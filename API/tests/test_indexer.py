@@ -0,0 +1,118 @@
+import asyncio
+from typing import Any, Dict, List
+from unittest import mock
+
+import pytest
+
+from app.services import indexer
+from app.services.graph import GRAPH_PREFAB_FIELDS
+from app.services.openSearch import INDEXED_PREFAB_FIELDS
+
+
+def test_outbox_worker_requires_process():
+    class Forgetful(indexer.OutboxWorker):
+        name = "forgetful"
+
+    with pytest.raises(TypeError):
+        Forgetful(mock.MagicMock())
+
+
+def test_workers_construct():
+    assert isinstance(indexer.search_indexer, indexer.OutboxWorker)
+    assert isinstance(indexer.graph_projector, indexer.OutboxWorker)
+
+
+def _search_doc(prefab_id: str, **fields: Any) -> Dict[str, Any]:
+    return {"id": prefab_id, "name": "Door", "description": "A door", "creator": {"id": "u", "username": "a"}, **fields}
+
+
+@pytest.fixture
+def search_docs(monkeypatch: pytest.MonkeyPatch) -> List[Dict[str, Any]]:
+    docs: List[Dict[str, Any]] = []
+    monkeypatch.setattr(indexer, "search_documents", mock.AsyncMock(return_value=docs))
+    return docs
+
+
+def _versions(monkeypatch: pytest.MonkeyPatch, found: Dict[tuple[str, str], tuple[int, int]]) -> mock.AsyncMock:
+    async def mget(body: Dict[str, Any]) -> Dict[str, Any]:
+        return {"docs": [
+            {"found": True, "_seq_no": found[(doc["_index"], doc["_id"])][0], "_primary_term": found[(doc["_index"], doc["_id"])][1]}
+            if (doc["_index"], doc["_id"]) in found else {"found": False}
+            for doc in body["docs"]
+        ]}
+
+    client = mock.MagicMock()
+    client.mget = mock.AsyncMock(side_effect=mget)
+    monkeypatch.setattr(indexer, "opensearch", client)
+    return client.mget
+
+
+def test_changed_fields():
+    before = {"name": "Door", "description": "Old", "external_links": [{"type": "Github", "url": "u"}]}
+    update = {"description": "New", "name": "Door", "external_links": [{"type": "Booth", "url": "u"}], "updated_at": "x"}
+
+    assert indexer.changed_fields(update, before, INDEXED_PREFAB_FIELDS) == ["description"]
+    assert indexer.changed_fields(update, before, GRAPH_PREFAB_FIELDS) == ["external_links"]
+    assert indexer.changed_fields({"name": "Door"}, before, GRAPH_PREFAB_FIELDS) == []
+
+
+def test_update_actions_are_conditional_partials(monkeypatch: pytest.MonkeyPatch, search_docs: List[Dict[str, Any]]):
+    search_docs.append(_search_doc("p1", embedding=[0.1, 0.2]))
+    _versions(monkeypatch, {("prefabs", "p1"): (7, 2)})
+
+    actions = asyncio.run(indexer.update_actions([{}], {"p1": {"name"}}, ["prefabs"]))
+
+    assert actions == [
+        {"update": {"_index": "prefabs", "_id": "p1", "if_seq_no": 7, "if_primary_term": 2}},
+        {"doc": {"name": "Door", "embedding": [0.1, 0.2]}},
+    ]
+
+
+def test_update_actions_leave_embedding_out_for_unembedded_fields(
+    monkeypatch: pytest.MonkeyPatch,
+    search_docs: List[Dict[str, Any]],
+):
+    search_docs.append(_search_doc("p1", embedding=[0.1, 0.2], licence_type="Custom"))
+    _versions(monkeypatch, {("prefabs", "p1"): (1, 1)})
+
+    actions = asyncio.run(indexer.update_actions([{}], {"p1": {"licence_type"}}, ["prefabs"]))
+
+    assert actions[1] == {"doc": {"licence_type": "Custom"}}
+
+
+def test_update_actions_index_whole_doc_where_missing(
+    monkeypatch: pytest.MonkeyPatch,
+    search_docs: List[Dict[str, Any]],
+):
+    # A reindex target that has not received the prefab yet
+    doc = _search_doc("p1")
+    search_docs.append(doc)
+    _versions(monkeypatch, {("prefabs", "p1"): (3, 1)})
+
+    actions = asyncio.run(indexer.update_actions([{}], {"p1": {"description"}}, ["prefabs", "prefabs_v2"]))
+
+    assert actions == [
+        {"update": {"_index": "prefabs", "_id": "p1", "if_seq_no": 3, "if_primary_term": 1}},
+        {"doc": {"description": "A door"}},
+        {"index": {"_index": "prefabs_v2", "_id": "p1"}},
+        doc,
+    ]
+
+
+def test_search_indexer_merges_entries(monkeypatch: pytest.MonkeyPatch):
+    build = mock.AsyncMock(return_value=[])
+    monkeypatch.setattr(indexer, "load_changes", mock.AsyncMock(return_value=([], [])))
+    monkeypatch.setattr(indexer, "build_bulk_actions", build)
+
+    entries = [
+        {"prefab_id": "p1", "fields": ["name"]},
+        {"prefab_id": "p1", "fields": ["description"]},
+        {"prefab_id": "p2", "fields": ["name"]},
+        {"prefab_id": "p2"},
+        {"prefab_id": "p2", "fields": ["content"]},
+    ]
+    failed = asyncio.run(indexer.search_indexer.process(["p1", "p2"], entries))
+
+    assert failed == set()
+    # p2 had a full entry, which wins over any partial one
+    assert build.await_args.args[2] == {"p1": {"name", "description"}}
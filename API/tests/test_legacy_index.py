@@ -0,0 +1,89 @@
+"""Search against a legacy index adopted by ensure_index."""
+import asyncio
+from typing import Any, Dict, Iterator
+from unittest import mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opensearchpy.exceptions import RequestError
+
+from app.routers import prefab
+from app.services import cache, openSearch
+from app.services.openSearch import LEGACY_INDEX, PREFABS_INDEX
+
+EMPTY_RESPONSE: Dict[str, Any] = {"hits": {"total": {"value": 0}, "hits": []}}
+
+
+def _legacy_cluster(rejected: set[str]) -> mock.MagicMock:
+    """An OpenSearch client whose only index is the legacy one."""
+    client = mock.MagicMock()
+    client.indices.exists = mock.AsyncMock(side_effect=lambda index: index == LEGACY_INDEX)
+    client.indices.put_alias = mock.AsyncMock()
+
+    async def put_mapping(index: str, body: Dict[str, Any]) -> None:
+        if rejected & set(body["properties"]):
+            raise RequestError(400, "illegal_argument_exception", {})
+
+    client.indices.put_mapping = mock.AsyncMock(side_effect=put_mapping)
+    client.search = mock.AsyncMock(return_value=EMPTY_RESPONSE)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def features(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(cache, "search_key", mock.AsyncMock(return_value=None))
+    yield
+    openSearch.unsupported_features.clear()
+
+
+def _adopt(monkeypatch: pytest.MonkeyPatch, rejected: set[str]) -> mock.MagicMock:
+    client = _legacy_cluster(rejected)
+    monkeypatch.setattr(openSearch, "opensearch", client)
+    monkeypatch.setattr(prefab, "opensearch", client)
+    asyncio.run(openSearch.ensure_index())
+    return client
+
+
+def _search(**params: Any):
+    app = FastAPI()
+    app.include_router(prefab.router)
+    return TestClient(app).get("/prefabs/search", params={"q": "door", **params})
+
+
+def test_adoption_maps_ranking_and_embedding(monkeypatch: pytest.MonkeyPatch):
+    client = _adopt(monkeypatch, set())
+
+    client.indices.put_alias.assert_awaited_once_with(index=LEGACY_INDEX, name=PREFABS_INDEX)
+    mapped = {}
+    for call in client.indices.put_mapping.await_args_list:
+        assert call.kwargs["index"] == LEGACY_INDEX
+        mapped.update(call.kwargs["body"]["properties"])
+    assert mapped["score_quality"]["type"] == "rank_feature"
+    assert mapped["embedding"]["type"] == "knn_vector"
+    assert openSearch.unsupported_features == set()
+
+    res = _search()
+    assert res.status_code == 200
+    body = client.search.await_args.kwargs["body"]
+    assert len(body["query"]["bool"]["should"]) == len(prefab.RANKING_BOOSTS)
+
+
+def test_search_skips_boosts_the_legacy_index_cannot_map(monkeypatch: pytest.MonkeyPatch):
+    # score_* were dynamically mapped as float before the adoption
+    client = _adopt(monkeypatch, {"score_quality", "embedding"})
+    assert openSearch.unsupported_features == {"ranking", "embedding"}
+
+    res = _search()
+    assert res.status_code == 200
+    body = client.search.await_args.kwargs["body"]
+    assert body["query"]["bool"]["should"] == []
+
+
+def test_hybrid_search_refused_without_embedding_mapping(monkeypatch: pytest.MonkeyPatch):
+    client = _adopt(monkeypatch, {"embedding"})
+    monkeypatch.setattr(prefab.embedder, "enabled", True)
+
+    res = _search(mode="hybrid")
+    assert res.status_code == 400
+    client.search.assert_not_awaited()
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import pytest
+from bson import ObjectId
+
+from app.models.common import sortable_timestamp
+from app.models.prefab import Prefab
+from app.services.pagination import (
+    decode_cursor,
+    decode_token,
+    encode_cursor,
+    encode_token,
+    keyset_filter,
+)
+
+BASE = datetime(2026, 3, 1, 12, 0, 5, tzinfo=timezone.utc)
+
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Evaluate the filters keyset_filter builds, the way Mongo compares strings."""
+    if "$or" in query:
+        return any(_matches(doc, clause) for clause in query["$or"])
+
+    for field, condition in query.items():
+        if isinstance(condition, dict) and "$lt" in condition:
+            if not doc[field] < condition["$lt"]:
+                return False
+        elif doc[field] != condition:
+            return False
+    return True
+
+
+def _pages(docs: List[Dict[str, Any]], limit: int) -> List[List[Dict[str, Any]]]:
+    """Walk a collection page by page, like the listing endpoints do."""
+    ordered = sorted(docs, key=lambda doc: (doc["created_at"], doc["_id"]), reverse=True)
+    pages: List[List[Dict[str, Any]]] = []
+    cursor = None
+
+    while True:
+        query = keyset_filter(cursor)
+        found = [doc for doc in ordered if _matches(doc, query)][:limit + 1]
+        pages.append(found[:limit])
+        if len(found) <= limit:
+            return pages
+        cursor = encode_cursor(found[limit - 1])
+
+
+def _stored(created_at: datetime) -> Dict[str, Any]:
+    prefab = Prefab(
+        name="p", description="d", content="c", use_cases=[], categories=[], external_links=[],
+        licence_type="Open Source", is_free=True, creator_id=str(ObjectId()), created_at=created_at,
+    )
+    return {"_id": ObjectId(), "created_at": prefab.model_dump(mode="json")["created_at"]}
+
+
+def test_sortable_timestamp_is_fixed_width_utc():
+    assert sortable_timestamp(BASE) == "2026-03-01T12:00:05.000000Z"
+    assert sortable_timestamp("2026-03-01T12:00:05+00:00") == "2026-03-01T12:00:05.000000Z"
+    assert sortable_timestamp("2026-03-01T14:00:05.123+02:00") == "2026-03-01T12:00:05.123000Z"
+    # Naive values are taken as UTC
+    assert sortable_timestamp("2026-03-01 12:00:05") == "2026-03-01T12:00:05.000000Z"
+
+
+def test_whole_seconds_sort_before_later_fractions():
+    whole = sortable_timestamp(BASE)
+    fraction = sortable_timestamp(BASE + timedelta(milliseconds=123))
+
+    assert whole < fraction
+
+
+def test_prefab_stores_sortable_timestamps():
+    doc = _stored(BASE)
+
+    assert doc["created_at"] == "2026-03-01T12:00:05.000000Z"
+
+
+def test_token_round_trip():
+    data = {"pit": "abc", "after": [1.5, "id"]}
+
+    assert decode_token(encode_token(data)) == data
+
+
+@pytest.mark.parametrize("token", ["", "not base64!", encode_token([1, 2]), encode_token({"c": 1, "i": "x"})])
+def test_malformed_cursor(token: str):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_cursor_round_trip_normalizes():
+    prefab_id = ObjectId()
+    # A cursor issued before timestamps had a fixed form
+    cursor = encode_token({"c": "2026-03-01T12:00:05+00:00", "i": str(prefab_id)})
+
+    assert decode_cursor(cursor) == {"created_at": "2026-03-01T12:00:05.000000Z", "_id": prefab_id}
+    assert decode_cursor(encode_cursor({"_id": prefab_id, "created_at": BASE})) == decode_cursor(cursor)
+
+
+def test_pages_cover_every_row_once_across_ties():
+    docs = [
+        _stored(BASE),
+        _stored(BASE),  # same created_at, told apart by _id
+        _stored(BASE + timedelta(milliseconds=123)),
+        _stored(BASE - timedelta(seconds=1)),
+        _stored(BASE + timedelta(seconds=1)),
+    ]
+
+    for limit in (1, 2, 3):
+        pages = _pages(docs, limit)
+        seen = [doc["_id"] for page in pages for doc in page]
+
+        assert len(seen) == len(docs)
+        assert set(seen) == {doc["_id"] for doc in docs}
+
+        times = [datetime.fromisoformat(doc["created_at"]) for page in pages for doc in page]
+        assert times == sorted(times, reverse=True)
@@ -0,0 +1,80 @@
+"""Which side PATCH /prefabs/{id} sends an edit to."""
+from typing import Any, Dict
+from unittest import mock
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_current_user_id
+from app.routers import prefab
+from app.services import cache
+
+USER_ID = str(ObjectId())
+PREFAB_ID = str(ObjectId())
+
+BEFORE: Dict[str, Any] = {
+    "_id": ObjectId(PREFAB_ID),
+    "name": "Door",
+    "description": "A door",
+    "content": "Opens",
+    "use_cases": ["Worlds"],
+    "categories": ["Tooling"],
+    "external_links": [{"type": "Github", "url": "https://github.com/a/door"}],
+    "licence_type": "Open Source",
+    "is_free": True,
+    "creator_id": USER_ID,
+    "created_at": "2026-03-01T12:00:05.000000Z",
+}
+
+
+@pytest.fixture
+def enqueue(monkeypatch: pytest.MonkeyPatch) -> mock.AsyncMock:
+    prefabs = mock.MagicMock()
+    prefabs.find_one_and_update = mock.AsyncMock(return_value=dict(BEFORE))
+    monkeypatch.setattr(prefab, "mongo_db", mock.MagicMock(prefabs=prefabs))
+
+    for name in ("invalidate_prefab", "invalidate_creator", "bump_prefabs_version"):
+        monkeypatch.setattr(cache, name, mock.AsyncMock())
+
+    enqueue = mock.AsyncMock()
+    monkeypatch.setattr(prefab.indexer, "enqueue", enqueue)
+    return enqueue
+
+
+def _patch(payload: Dict[str, Any]):
+    app = FastAPI()
+    app.include_router(prefab.router)
+    app.dependency_overrides[get_current_user_id] = lambda: USER_ID
+    return TestClient(app).patch(f"/prefabs/{PREFAB_ID}", json=payload)
+
+
+def test_link_only_edit_reaches_graph_only(enqueue: mock.AsyncMock):
+    res = _patch({"external_links": [{"type": "Booth", "url": "https://booth.pm/door"}]})
+
+    assert res.status_code == 200
+    enqueue.assert_awaited_once_with(PREFAB_ID, [], search=False, graph=True)
+    cache.invalidate_prefab.assert_awaited_once_with(PREFAB_ID, search=False) # type: ignore
+
+
+def test_description_edit_reaches_search_only(enqueue: mock.AsyncMock):
+    res = _patch({"description": "A heavy door"})
+
+    assert res.status_code == 200
+    enqueue.assert_awaited_once_with(PREFAB_ID, ["description"], search=True, graph=False)
+
+
+def test_name_edit_reaches_both(enqueue: mock.AsyncMock):
+    res = _patch({"name": "Gate", "description": "A door"})
+
+    assert res.status_code == 200
+    enqueue.assert_awaited_once_with(PREFAB_ID, ["name"], search=True, graph=True)
+
+
+def test_unchanged_values_enqueue_nothing(enqueue: mock.AsyncMock):
+    res = _patch({"name": "Door", "external_links": BEFORE["external_links"]})
+
+    assert res.status_code == 200
+    enqueue.assert_not_awaited()
+    assert res.json()["updated_at"].endswith("Z")
@@ -0,0 +1,98 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.services import ratelimit
+from app.services.ratelimit import LocalBuckets, match_rule, parse_limit, rule
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    return clock
+
+
+def test_parse_limit():
+    assert parse_limit("60/60") == (60, 60.0)
+    assert parse_limit("5") == (5, 1.0)
+
+
+@pytest.mark.parametrize("method, path, name", [
+    ("GET", "/prefabs/search", "search"),
+    ("POST", "/prefabs/search", "write"),
+    ("POST", "/prefabs/bulk", "bulk"),
+    ("POST", "/prefabs/batch", "batch"),
+    ("PATCH", "/prefabs/abc", "write"),
+    ("GET", "/prefabs/abc", "default"),
+    ("GET", "/auth/discord/callback", "auth"),
+    ("GET", "/users/me/profile", "default"),
+])
+def test_first_matching_rule_wins(method: str, path: str, name: str):
+    r = match_rule(method, path)
+
+    assert r is not None and r.name == name
+
+
+@pytest.mark.parametrize("method, path", [("GET", "/health"), ("GET", "/metrics"), ("OPTIONS", "/prefabs/search")])
+def test_exempt_requests(method: str, path: str):
+    assert match_rule(method, path) is None
+
+
+def test_local_bucket_drains_then_refills(clock: Clock):
+    buckets = LocalBuckets(10)
+    # 3 requests per 3 seconds, one token a second
+
+    assert [buckets.take("k", 3, 1.0)[0] for _ in range(4)] == [True, True, True, False]
+
+    clock.now += 0.5
+    assert buckets.take("k", 3, 1.0)[0] is False
+
+    clock.now += 0.5
+    allowed, tokens = buckets.take("k", 3, 1.0)
+    assert allowed is True
+    assert tokens == pytest.approx(0.0)
+
+
+def test_local_bucket_caps_at_capacity(clock: Clock):
+    buckets = LocalBuckets(10)
+    buckets.take("k", 3, 1.0)
+
+    clock.now += 100
+    allowed, tokens = buckets.take("k", 3, 1.0)
+
+    assert allowed is True
+    assert tokens == pytest.approx(2.0)
+
+
+def test_local_buckets_are_per_key(clock: Clock):
+    buckets = LocalBuckets(10)
+    assert buckets.take("a", 1, 1.0)[0] is True
+    assert buckets.take("a", 1, 1.0)[0] is False
+
+    assert buckets.take("b", 1, 1.0)[0] is True
+
+
+def test_check_falls_back_to_local_buckets(monkeypatch: pytest.MonkeyPatch, clock: Clock):
+    script = mock.AsyncMock(side_effect=ConnectionError("down"))
+    monkeypatch.setattr(ratelimit, "token_bucket", script)
+    monkeypatch.setattr(ratelimit, "local_buckets", LocalBuckets(10))
+    monkeypatch.setattr(ratelimit, "_redis_down_until", 0.0)
+    r = rule("test", "/", "2/2")
+
+    decisions = [asyncio.run(ratelimit.check(r, "client")) for _ in range(3)]
+
+    assert [d.allowed for d in decisions] == [True, True, False]
+    assert decisions[2].retry_after == 1
+    # Redis is left alone for REDIS_RETRY_AFTER after the first failure
+    assert script.await_count == 1
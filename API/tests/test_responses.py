@@ -0,0 +1,50 @@
+from typing import Dict
+
+import pytest
+from starlette.requests import Request
+
+from app.core.responses import cache_headers, make_etag, not_modified
+
+ETAG = make_etag("prefabs", 3, 20, None)
+
+
+def _request(headers: Dict[str, str]) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_etag_is_stable_and_quoted():
+    assert ETAG == make_etag("prefabs", 3, 20, None)
+    assert ETAG != make_etag("prefabs", 4, 20, None)
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+
+
+@pytest.mark.parametrize("header", [
+    ETAG,
+    f"W/{ETAG}",
+    f'"other", {ETAG}',
+    f'"other",W/{ETAG}',
+    "*",
+])
+def test_matching_if_none_match(header: str):
+    response = not_modified(_request({"If-None-Match": header}), ETAG, "max-age=0")
+
+    assert response is not None
+    assert response.status_code == 304
+    assert response.headers["ETag"] == ETAG
+    assert response.headers["Cache-Control"] == "max-age=0"
+
+
+@pytest.mark.parametrize("headers", [{}, {"If-None-Match": '"other"'}, {"If-None-Match": ETAG[:-2] + '"'}])
+def test_other_requests_are_served(headers: Dict[str, str]):
+    assert not_modified(_request(headers), ETAG, "max-age=0") is None
+
+
+def test_unknown_etag_never_revalidates():
+    # No ETag when the version is unknown, so even "*" gets a full response
+    assert not_modified(_request({"If-None-Match": "*"}), None, "max-age=0") is None
+    assert cache_headers(None, "max-age=0") == {"Cache-Control": "max-age=0"}
@@ -0,0 +1,108 @@
+"""Pure helpers behind /prefabs/search."""
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import prefab
+from app.routers.prefab import FACET_FIELDS, RRF_K, _add_facets, _facet_counts, _fuse
+
+USE_CASES = {"terms": {"use_cases.keyword": ["Worlds"]}}
+IS_FREE = {"term": {"is_free": True}}
+
+
+def _query() -> Dict[str, Any]:
+    return {"size": 20, "query": {"bool": {"must": [{"match_all": {}}], "filter": []}}}
+
+
+def test_facets_move_selections_to_post_filter():
+    body = _query()
+    body["query"]["bool"]["filter"] = [USE_CASES, IS_FREE]
+
+    _add_facets(body, {"use_cases": USE_CASES, "is_free": IS_FREE})
+
+    # The query itself no longer narrows what the aggregations see
+    assert body["query"]["bool"]["filter"] == []
+    assert body["post_filter"] == {"bool": {"filter": [USE_CASES, IS_FREE]}}
+
+
+def test_each_facet_ignores_only_its_own_selection():
+    body = _query()
+    _add_facets(body, {"use_cases": USE_CASES, "is_free": IS_FREE})
+    aggs = body["aggs"]
+
+    assert set(aggs) == set(FACET_FIELDS)
+    assert aggs["use_cases"]["filter"]["bool"]["filter"] == [IS_FREE]
+    assert aggs["is_free"]["filter"]["bool"]["filter"] == [USE_CASES]
+    assert aggs["categories"]["filter"]["bool"]["filter"] == [USE_CASES, IS_FREE]
+    assert aggs["categories"]["aggs"]["values"]["terms"]["field"] == "categories.keyword"
+
+
+def test_facets_without_selection():
+    body = _query()
+    _add_facets(body, {})
+
+    assert "post_filter" not in body
+    assert all(agg["filter"]["bool"]["filter"] == [] for agg in body["aggs"].values())
+
+
+def test_facet_counts():
+    aggregations = {
+        "use_cases": {"values": {"buckets": [{"key": "Worlds", "doc_count": 4}]}},
+        "is_free": {"values": {"buckets": [{"key": 1, "doc_count": 3}, {"key": 0, "doc_count": 1}]}},
+    }
+
+    assert _facet_counts(aggregations) == {
+        "use_cases": [{"value": "Worlds", "count": 4}],
+        "is_free": [{"value": True, "count": 3}, {"value": False, "count": 1}],
+    }
+
+
+def _hits(*ids: str) -> Dict[str, Any]:
+    return {"hits": {"hits": [{"_id": hit_id, "_source": {"id": hit_id}, "_score": 10.0} for hit_id in ids]}}
+
+
+def test_fuse_ranks_by_reciprocal_rank():
+    fused = _fuse([_hits("a", "b", "c"), _hits("c", "d")])
+
+    assert [hit["_id"] for hit in fused] == ["c", "a", "b", "d"]
+    assert fused[0]["_score"] == round(1 / (RRF_K + 3) + 1 / (RRF_K + 1), 6)
+    assert fused[1]["_score"] == round(1 / (RRF_K + 1), 6)
+
+
+def test_fuse_keeps_first_responses_copy():
+    lexical = _hits("a")
+    lexical["hits"]["hits"][0]["highlight"] = {"content": ["<em>door</em>"]}
+
+    fused = _fuse([lexical, _hits("a")])
+
+    assert fused[0]["highlight"] == {"content": ["<em>door</em>"]}
+
+
+def test_fuse_ignores_raw_scores():
+    # A huge BM25 score on one side cannot outrank agreement between both
+    lexical = _hits("a", "b")
+    lexical["hits"]["hits"][0]["_score"] = 1000.0
+    fused = _fuse([lexical, _hits("b", "c")])
+
+    assert [hit["_id"] for hit in fused] == ["b", "a", "c"]
+
+
+def test_fuse_empty():
+    empty: List[Dict[str, Any]] = [{"hits": {"hits": []}}, {"hits": {"hits": []}}]
+
+    assert _fuse(empty) == []
+
+
+@pytest.mark.parametrize("requested, installed, status", [(True, False, 501), (False, False, 400), (False, True, 400)])
+def test_hybrid_without_embedder(monkeypatch: pytest.MonkeyPatch, requested: bool, installed: bool, status: int):
+    monkeypatch.setattr(prefab.embedder, "requested", requested)
+    monkeypatch.setattr(prefab.embedder, "installed", installed)
+    monkeypatch.setattr(prefab.embedder, "enabled", False)
+
+    app = FastAPI()
+    app.include_router(prefab.router)
+    res = TestClient(app).get("/prefabs/search", params={"q": "door", "mode": "hybrid"})
+
+    assert res.status_code == status
@@ -0,0 +1,286 @@
+"""Load test for the prefab API: seed data, drive the hot routes, report latency.
+
+Runs against the docker-compose stack (or any deployed API). Tokens are
+minted locally with JWT_SECRET, so no Discord login is needed. Start the API
+with RATE_LIMIT_ENABLED=false, otherwise the limiter is what gets measured.
+
+    python scripts/bench_load.py --scale 1k --concurrency 32
+    python scripts/bench_load.py --scale 100k --seed --json results.json
+    python scripts/bench_load.py --baseline results.json --max-regression 0.2
+
+--in-process drives the ASGI app directly, without uvicorn and the network,
+using the same backend env vars as the API.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from bson import ObjectId
+from faker import Faker
+from jose import jwt
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from mock_data import random_prefab_data  # noqa: E402
+
+fake = Faker()
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+SCENARIOS = ["search", "detail", "list", "create", "update"]
+
+
+# ---------- Helpers ----------
+def mint_token(secret: str, user_id: str, username: str) -> str:
+    # Same claims the Discord callback issues
+    return jwt.encode(
+        {
+            "sub": user_id,
+            "username": username,
+            "discord_id": str(random.getrandbits(60)),
+            "exp": int(time.time()) + 60 * 60,
+        },
+        secret,
+        algorithm="HS256",
+    )
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+@dataclass
+class Result:
+    scenario: str
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        values = sorted(self.latencies)
+        return {
+            "requests": len(values),
+            "errors": self.errors,
+            "rps": round(len(values) / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+        }
+
+
+class Bench:
+    def __init__(self, client: httpx.AsyncClient, token: str):
+        self.client = client
+        self.auth = {"Authorization": f"Bearer {token}"}
+        self.prefab_ids: List[str] = []
+        self.own_ids: List[str] = []
+        self.words: List[str] = []
+
+    # ---------- Setup ----------
+    async def seed(self, total: int, batch_size: int, concurrency: int) -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+        created = 0
+        started = time.perf_counter()
+
+        async def send(count: int) -> None:
+            nonlocal created
+            async with semaphore:
+                batch = [random_prefab_data() for _ in range(count)] # type: ignore
+                response = await self.client.post(
+                    "/prefabs/bulk", params={"batch_size": batch_size}, json=batch, headers=self.auth
+                )
+                if response.status_code != 200:
+                    print(f"Seed batch failed: {response.status_code} {response.text[:200]}")
+                    return
+                created += response.json()["created"]
+                print(f"\rSeeded {created}/{total}", end="", flush=True)
+
+        await asyncio.gather(*(
+            send(min(batch_size, total - offset)) for offset in range(0, total, batch_size)
+        ))
+        print(f"\nSeeded {created} prefabs in {time.perf_counter() - started:.1f}s")
+
+    async def collect_ids(self, limit: int) -> None:
+        cursor = None
+        while len(self.prefab_ids) < limit:
+            params: Dict[str, Any] = {"limit": 200}
+            if cursor:
+                params["cursor"] = cursor
+            response = await self.client.get("/prefabs/", params=params)
+            response.raise_for_status()
+            page = response.json()
+            self.prefab_ids.extend(item["_id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+        # Search terms drawn from the same vocabulary Faker seeded with
+        self.words = [fake.word() for _ in range(200)]
+
+    # ---------- Scenarios ----------
+    async def search(self) -> httpx.Response:
+        return await self.client.get("/prefabs/search", params={"q": random.choice(self.words)})
+
+    async def detail(self) -> httpx.Response:
+        return await self.client.get(f"/prefabs/{random.choice(self.prefab_ids)}")
+
+    async def list(self) -> httpx.Response:
+        return await self.client.get("/prefabs/", params={"limit": 50})
+
+    async def create(self) -> httpx.Response:
+        response = await self.client.post("/prefabs/", json=random_prefab_data(), headers=self.auth) # type: ignore
+        if response.status_code == 200:
+            self.own_ids.append(response.json()["id"])
+        return response
+
+    async def update(self) -> httpx.Response:
+        if not self.own_ids:
+            return await self.create()
+        return await self.client.patch(
+            f"/prefabs/{random.choice(self.own_ids)}",
+            json={"description": fake.text(max_nb_chars=200)},
+            headers=self.auth,
+        )
+
+    async def run(self, scenario: str, requests: int, concurrency: int) -> Result:
+        call: Callable[[], Awaitable[httpx.Response]] = getattr(self, scenario)
+        result = Result(scenario)
+        remaining = requests
+
+        async def worker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await call()
+                except httpx.HTTPError:
+                    result.errors += 1
+                    continue
+                result.latencies.append(time.perf_counter() - started)
+                result.statuses[response.status_code] = result.statuses.get(response.status_code, 0) + 1
+                if response.status_code >= 400:
+                    result.errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        result.elapsed = time.perf_counter() - started
+        return result
+
+
+# ---------- Reporting ----------
+def print_report(summaries: Dict[str, Dict[str, Any]]) -> None:
+    print(f"\n{'scenario':<10} {'reqs':>7} {'errors':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, s in summaries.items():
+        print(
+            f"{name:<10} {s['requests']:>7} {s['errors']:>7} {s['rps']:>9} "
+            f"{s['p50_ms']:>9} {s['p95_ms']:>9} {s['p99_ms']:>9} {s['max_ms']:>9}"
+        )
+
+
+def regressions(summaries: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    failed: List[str] = []
+    for name, s in summaries.items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or not before["p95_ms"]:
+            continue
+        change = s["p95_ms"] / before["p95_ms"] - 1
+        if change > max_regression:
+            failed.append(f"{name}: p95 {before['p95_ms']}ms -> {s['p95_ms']}ms (+{change:.0%})")
+    return failed
+
+
+# ---------- Main ----------
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Prefab API load test")
+    parser.add_argument("--api-url", default=os.getenv("API_URL", "http://localhost:8000"))
+    parser.add_argument("--jwt-secret", default=os.getenv("JWT_SECRET"))
+    parser.add_argument("--scale", default="1k", help="1k, 100k, 1m or a number of prefabs to seed")
+    parser.add_argument("--seed", action="store_true", help="seed --scale prefabs before measuring")
+    parser.add_argument("--seed-batch-size", type=int, default=500)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--in-process", action="store_true", help="drive the ASGI app without a server")
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare p95 against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if not args.jwt_secret:
+        parser.error("JWT_SECRET (or --jwt-secret) is required to mint tokens")
+
+    scale = SCALES.get(args.scale.lower()) or int(args.scale)
+    token = mint_token(args.jwt_secret, str(ObjectId()), f"bench-{fake.user_name()}")
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    lifespan = None
+    if args.in_process:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "API"))
+        os.environ.setdefault("JWT_SECRET", args.jwt_secret)
+        from app.main import app
+
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+    else:
+        client = httpx.AsyncClient(base_url=args.api_url, limits=limits, timeout=60)
+
+    try:
+        bench = Bench(client, token)
+        if args.seed:
+            await bench.seed(scale, args.seed_batch_size, min(args.concurrency, 8))
+        await bench.collect_ids(min(scale, 5000))
+
+        if not bench.prefab_ids:
+            print("No prefabs found; run with --seed first")
+            return 1
+
+        summaries: Dict[str, Dict[str, Any]] = {}
+        for scenario in args.scenarios.split(","):
+            result = await bench.run(scenario.strip(), args.requests, args.concurrency)
+            summaries[result.scenario] = result.summary()
+            print(f"{result.scenario}: done in {result.elapsed:.1f}s")
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    print_report(summaries)
+
+    report = {
+        "api_url": "in-process" if args.in_process else args.api_url,
+        "scale": scale,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "scenarios": summaries,
+    }
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failed = regressions(summaries, json.load(f), args.max_regression)
+        for line in failed:
+            print(f"REGRESSION {line}")
+        if failed:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,106 @@
+"""Benchmark of per-document response serialization for prefab listings.
+
+Compares the old path (Prefab(**doc) per document, then FastAPI's
+response_model validation and json.dumps) with validating once and
+serializing through model_response. Run from the repository root:
+
+    python scripts/bench_serialization.py
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+# App modules read these at import time; clients connect lazily, so nothing is contacted
+for name, value in {
+    "MONGO_URI": "mongodb://localhost:27017/prefabs",
+    "NEO4J_URI": "bolt://localhost:7687",
+    "NEO4J_USER": "neo4j",
+    "NEO4J_PASSWORD": "devpassword",
+    "OPENSEARCH_HOST": "http://localhost:9200",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "DISCORD_CLIENT_ID": "bench",
+    "DISCORD_CLIENT_SECRET": "bench",
+    "JWT_SECRET": "bench-secret",
+}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "API"))
+
+from bson import ObjectId  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from app.core.responses import model_response  # noqa: E402
+from app.models.prefab import Prefab, PrefabPage  # noqa: E402
+
+# ---------- Config ----------
+NUM_DOCS = int(os.getenv("NUM_DOCS", "10000"))
+ROUNDS = int(os.getenv("ROUNDS", "5"))
+
+
+def make_doc(i: int) -> dict:
+    # Shaped like a stored prefab: model_dump(mode="json") plus the Mongo _id
+    return {
+        "_id": ObjectId(),
+        "name": f"Prefab {i}",
+        "description": "A OSC app that is used to add full skeletal hand tracking to your avatar",
+        "content": "# Heading\n" + "Some markdown content. " * 20,
+        "creator_id": str(ObjectId()),
+        "use_cases": ["Avatars", "Osc"],
+        "categories": ["Animations", "Tooling"],
+        "external_links": [
+            {"type": "Github", "url": f"https://github.com/example/prefab-{i}"},
+            {"type": "Booth", "url": f"https://booth.pm/en/items/{3024678 + i}"},
+        ],
+        "licence_type": "Open Source",
+        "is_free": True,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": None,
+    }
+
+
+docs = [make_doc(i) for i in range(NUM_DOCS)]
+page_field = create_model_field("Response_get_all_prefabs", PrefabPage, mode="serialization")
+
+
+async def old_path() -> bytes:
+    page = PrefabPage(items=[Prefab(**doc) for doc in docs], next_cursor=None)
+    content = await serialize_response(field=page_field, response_content=page)
+    return JSONResponse(content).body
+
+
+async def new_path() -> bytes:
+    page = PrefabPage.model_validate({"items": docs, "next_cursor": None})
+    return model_response(page).body
+
+
+async def orjson_path() -> bytes:
+    import orjson
+    page = PrefabPage.model_validate({"items": docs, "next_cursor": None})
+    return orjson.dumps(page.model_dump(mode="json", by_alias=True))
+
+
+async def measure(label: str, func) -> None: # type: ignore
+    best = float("inf")
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        body = await func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<36} {best / NUM_DOCS * 1e6:8.2f} us/doc  ({len(body) / 1e6:.1f} MB)")
+
+
+async def main() -> None:
+    print(f"{NUM_DOCS} documents, best of {ROUNDS} rounds")
+    await measure("Prefab(**doc) + response_model", old_path)
+    await measure("model_validate + model_response", new_path)
+    try:
+        import orjson  # noqa: F401
+        await measure("model_validate + orjson", orjson_path)
+    except ImportError:
+        print("model_validate + orjson               (not installed)")
+
+
+asyncio.run(main())
@@ -1,3 +1,4 @@
+import os
 import random
 import requests
 from faker import Faker
@@ -37,9 +38,10 @@ class Licencing(str, Enum):
     CUSTOM = "Custom"
 
 # ---------- Config ----------
-API_URL = "http://localhost:8000/prefabs/"
-AUTH_TOKEN = ""
-NUM_PREFABS = 500  # how many fake prefabs to create
+API_URL = os.getenv("API_URL", "http://localhost:8000/prefabs/bulk")
+AUTH_TOKEN = os.getenv("AUTH_TOKEN", "")
+NUM_PREFABS = int(os.getenv("NUM_PREFABS", "500"))  # how many fake prefabs to create
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "100"))  # prefabs sent per bulk request
 
 # ---------- Helper functions ----------
 def random_external_links(): # type: ignore
@@ -65,16 +67,30 @@ def random_prefab_data(): # type: ignore
     } # type: ignore
 
 # ---------- Create prefabs ----------
-headers = {
-    "accept": "application/json",
-    "Authorization": AUTH_TOKEN,
-    "Content-Type": "application/json"
-}
+def main() -> None:
+    headers = {
+        "accept": "application/json",
+        "Authorization": AUTH_TOKEN,
+        "Content-Type": "application/json"
+    }
 
-for _ in range(NUM_PREFABS):
-    data = random_prefab_data() # type: ignore
-    response = requests.post(API_URL, headers=headers, json=data) # type: ignore
-    if response.status_code == 200 or response.status_code == 201:
-        print(f"Created prefab: {data['name']}")
-    else:
-        print(f"Failed to create prefab: {response.status_code} {response.text}")
+    remaining = NUM_PREFABS
+    while remaining > 0:
+        batch = [random_prefab_data() for _ in range(min(BATCH_SIZE, remaining))] # type: ignore
+        remaining -= len(batch)
+
+        response = requests.post(API_URL, headers=headers, params={"batch_size": BATCH_SIZE}, json=batch) # type: ignore
+        if response.status_code != 200:
+            print(f"Failed to create batch: {response.status_code} {response.text}")
+            continue
+
+        body = response.json()
+        for result in body["results"]:
+            if result["status"] == "created":
+                print(f"Created prefab: {batch[result['index']]['name']}")
+            else:
+                print(f"Failed to create prefab: {batch[result['index']]['name']} {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Local stand-in for the Discord OAuth endpoints used by /auth/discord/callback.
+
+Start it, then point the API at it:
+
+    python scripts/stub_discord.py --port 8090
+    DISCORD_API_BASE=http://localhost:8090 uvicorn app.main:app
+
+The authorization code doubles as the username, so `/auth/discord/callback?code=alice`
+logs in a stable user "alice". `--rate-limit-every N` answers every Nth request
+with a 429 to exercise the client's retry handling, and `--token-errors N`
+answers the first N token exchanges with a 502 after accepting them, like a
+gateway losing the response.
+"""
+import argparse
+import hashlib
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+state = {"requests": 0, "rate_limit_every": 0, "token_errors": 0}
+
+
+def discord_id(username: str) -> str:
+    # Stable snowflake-looking id per username
+    return str(int(hashlib.sha1(username.encode()).hexdigest()[:15], 16))
+
+
+class StubDiscordHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def send_json(self, status: int, body: dict, headers: dict | None = None) -> None: # type: ignore
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def rate_limited(self) -> bool:
+        state["requests"] += 1
+        every = state["rate_limit_every"]
+        if every and state["requests"] % every == 0:
+            self.send_json(429, {"message": "You are being rate limited.", "retry_after": 0.1}, {"Retry-After": "0.1"})
+            return True
+        return False
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+
+        if self.rate_limited():
+            return
+
+        if not self.path.endswith("/oauth2/token"):
+            self.send_json(404, {"message": "Not found"})
+            return
+
+        code = form.get("code", [""])[0]
+        if not code or code == "invalid":
+            self.send_json(400, {"error": "invalid_grant"})
+            return
+
+        if state["token_errors"]:
+            state["token_errors"] -= 1
+            self.send_json(502, {"message": "Bad Gateway"})
+            return
+
+        self.send_json(200, {"access_token": f"stub-{code}", "token_type": "Bearer", "expires_in": 604800})
+
+    def do_GET(self) -> None:
+        if self.rate_limited():
+            return
+
+        if not self.path.endswith("/users/@me"):
+            self.send_json(404, {"message": "Not found"})
+            return
+
+        auth = self.headers.get("Authorization", "")
+        if not auth.startswith("Bearer stub-"):
+            self.send_json(401, {"message": "401: Unauthorized"})
+            return
+
+        username = auth.removeprefix("Bearer stub-")
+        self.send_json(200, {
+            "id": discord_id(username),
+            "username": username,
+            "discriminator": "0",
+            "avatar": None,
+        })
+
+    def log_message(self, format: str, *args) -> None: # type: ignore
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stub Discord OAuth server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--token-errors", type=int, default=0)
+    args = parser.parse_args()
+
+    state["rate_limit_every"] = args.rate_limit_every
+    state["token_errors"] = args.token_errors
+
+    server = ThreadingHTTPServer((args.host, args.port), StubDiscordHandler)
+    print(f"Stub Discord listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()